@@ -0,0 +1,217 @@
+"""Times the construction and export of every chart class at several data sizes.
+
+Usage: `uv run ./benchmarks/charts.py [--sizes 1e3,1e5,1e6] [--charts BarChart,Table] [--repeat 3]
+[--output results.json] [--compare previous.json] [--threshold 1.25]`
+
+For every chart and size it measures the construction, `get_figure`, `save_json` and `save_excel` durations, the
+export file sizes and (in a separate, traced pass, as tracemalloc slows the code down) the peak memory use.
+Every case runs `--repeat` times and the fastest duration of every phase is kept.
+The results are written as json. With `--compare` the durations and peak memory are compared with an earlier
+results file, and the benchmark fails (exit code 1) when one grew by more than the threshold factor. Durations under
+`MIN_SECONDS` are too noisy to compare and skipped.
+"""
+
+from pathlib import Path
+import argparse
+import datetime
+import importlib.metadata
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np
+import pandas as pd
+
+import dt_modules
+
+PHASES = ("construct", "get_figure", "save_json", "save_excel")
+GROUPS = 12
+MIN_SECONDS = 0.01
+
+
+def make_data(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Returns a dataframe with `rows` rows of a time series for `GROUPS` groups and a few categorical columns."""
+
+    rng = np.random.default_rng(seed)
+
+    return pd.DataFrame({
+        "step": np.arange(rows) // GROUPS,
+        "group": np.array([f"group {i}" for i in range(GROUPS)])[np.arange(rows) % GROUPS],
+        "sector": np.array(["Bouw", "Zorg", "Onderwijs", "ICT", "Handel"])[rng.integers(0, 5, rows)],
+        "region": np.array([f"region {i}" for i in range(40)])[rng.integers(0, 40, rows)],
+        "value": rng.normal(100, 15, rows).cumsum() / np.sqrt(np.arange(1, rows + 1)),
+    })
+
+
+# The arguments every chart is created with.
+CHARTS = {
+    "BarChart": lambda data: dt_modules.BarChart(data, x="sector", y="value", column_to_color="sector"),
+    "PieChart": lambda data: dt_modules.PieChart(data, values="value", names="sector"),
+    "LineChart": lambda data: dt_modules.LineChart(data, x="step", y="value", column_to_color="group"),
+    "ScatterPlot": lambda data: dt_modules.ScatterPlot(data, x="step", y="value"),
+    "Histogram": lambda data: dt_modules.Histogram(data, x="value", nbins=50),
+    "BoxPlot": lambda data: dt_modules.BoxPlot(data, x="sector", y="value", column_to_color="sector"),
+    "HeatMap": lambda data: dt_modules.HeatMap(data, x="region", y="sector", value_column="value", aggfunc="mean"),
+    "Table": lambda data: dt_modules.Table(data),
+}
+
+
+def run_case(name: str, data: pd.DataFrame, directory: Path, excel_format: str) -> dict:
+    """Builds and exports one chart, returns the duration of every phase and the file sizes."""
+
+    timings = {}
+    start = time.perf_counter()
+
+    chart = CHARTS[name](data)
+    timings["construct"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    chart.get_figure()
+    timings["get_figure"] = time.perf_counter() - start
+
+    json_path = directory / f"{name}.export.json"
+    start = time.perf_counter()
+    chart.save_json(str(json_path))
+    timings["save_json"] = time.perf_counter() - start
+
+    excel_path = directory / f"{name}.export.{excel_format}"
+    start = time.perf_counter()
+    chart.save_excel(str(excel_path))
+    timings["save_excel"] = time.perf_counter() - start
+
+    return {
+        "seconds": timings,
+        "json_bytes": json_path.stat().st_size,
+        "excel_bytes": excel_path.stat().st_size,
+    }
+
+
+def measure(name: str, rows: int, excel_format: str, memory: bool, repeat: int = 1) -> dict:
+    """Runs the benchmark of one chart class at one data size, errors are recorded instead of raised."""
+
+    result = {"chart": name, "rows": rows}
+    data = make_data(rows)
+
+    with tempfile.TemporaryDirectory() as directory:
+        try:
+            runs = [run_case(name, data, Path(directory), excel_format) for _ in range(repeat)]
+            result.update(runs[0])
+            result["seconds"] = {phase: min(run["seconds"][phase] for run in runs) for phase in PHASES}
+
+            if memory:
+                tracemalloc.start()
+
+                try:
+                    run_case(name, data, Path(directory), excel_format)
+                    result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+                finally:
+                    tracemalloc.stop()
+        except Exception as error:
+            result["error"] = f"{type(error).__name__}: {error}"
+
+    return result
+
+
+def environment() -> dict:
+    versions = {}
+    for package in ("dt-modules", "plotly", "pandas", "numpy", "openpyxl", "orjson"):
+        try:
+            versions[package] = importlib.metadata.version(package)
+        except importlib.metadata.PackageNotFoundError:
+            versions[package] = None
+
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "versions": versions,
+    }
+
+
+def compare(results: list[dict], previous: list[dict], threshold: float) -> list[str]:
+    """Returns a description of every duration or peak memory that grew by more than `threshold` times."""
+
+    earlier = {(result["chart"], result["rows"]): result for result in previous}
+    regressions = []
+
+    for result in results:
+        before = earlier.get((result["chart"], result["rows"]))
+
+        if before is None or "error" in result or "error" in before:
+            continue
+
+        metrics = [
+            (phase, result["seconds"][phase], before["seconds"][phase])
+            for phase in PHASES
+            if max(result["seconds"][phase], before["seconds"][phase]) >= MIN_SECONDS
+        ]
+        if "peak_bytes" in result and "peak_bytes" in before:
+            metrics.append(("peak_bytes", result["peak_bytes"], before["peak_bytes"]))
+
+        for metric, value, baseline in metrics:
+            ratio = value / baseline if baseline else 1.0
+            print(f"{result['chart']:>12} {result['rows']:>9} {metric:>12}: {ratio:5.2f}x")
+
+            if ratio > threshold:
+                regressions.append(f"{result['chart']} at {result['rows']} rows: {metric} {ratio:.2f}x slower/larger")
+
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="1e3,1e5,1e6", help="comma separated row counts")
+    parser.add_argument("--charts", default=",".join(CHARTS), help="comma separated chart classes")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--excel-format", default="xlsx", choices=("xlsx", "csv", "parquet"))
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced pass measuring the peak memory")
+    parser.add_argument("--output", default="benchmark-results.json")
+    parser.add_argument("--compare", help="an earlier results file to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25)
+    args = parser.parse_args()
+
+    sizes = [int(float(size)) for size in args.sizes.split(",")]
+    charts = args.charts.split(",")
+
+    unknown = set(charts) - set(CHARTS)
+    if unknown:
+        parser.error(f"unknown charts: {', '.join(sorted(unknown))}")
+
+    # Build a small chart first, so the first measurement does not include importing plotly.
+    CHARTS["BarChart"](make_data(10)).get_figure()
+
+    results = []
+    for rows in sizes:
+        for name in charts:
+            result = measure(name, rows, args.excel_format, not args.no_memory, args.repeat)
+            results.append(result)
+
+            if "error" in result:
+                print(f"{name:>12} {rows:>9}: {result['error']}")
+            else:
+                timings = " ".join(f"{phase} {result['seconds'][phase]:7.3f}s" for phase in PHASES)
+                peak = f" peak {result['peak_bytes'] / 2**20:7.1f} MiB" if "peak_bytes" in result else ""
+                print(f"{name:>12} {rows:>9}: {timings} json {result['json_bytes'] / 2**20:7.1f} MiB{peak}")
+
+    with open(args.output, "w") as f:
+        json.dump({"environment": environment(), "results": results}, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f)["results"], args.threshold)
+
+        for regression in regressions:
+            print(f"FAIL: {regression}")
+
+        return 1 if regressions else 0
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
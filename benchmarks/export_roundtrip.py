@@ -0,0 +1,146 @@
+"""Guards that every export this library writes can be read and loaded back.
+
+Usage: `uv run ./benchmarks/export_roundtrip.py`
+
+Saves every chart class, with missing values in its data, with every JSON engine, data format and compression.
+Every export is read with `read_export` and loaded with `load_export`. The loaded chart is saved again, and its
+export must hold the same contents. A loaded line chart must also extend its traces like the original when rows are
+appended. Fails (exit code 1) when a case raises or differs.
+"""
+
+from pathlib import Path
+import importlib.util
+import json
+import sys
+import tempfile
+import traceback
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+
+import numpy as np
+import pandas as pd
+
+import dt_modules
+from dt_modules import load_export, read_export
+
+ENGINES = ("json", "orjson") if importlib.util.find_spec("orjson") is not None else ("json",)
+FORMATS = (
+    {"data_format": "dict"},
+    {"data_format": "columnar"},
+    {"data_format": "columnar", "binary": False},
+    {"data_format": "sidecar"},
+)
+SUFFIXES = (".export.json", ".export.json.gz")
+
+
+def make_data() -> pd.DataFrame:
+    """Returns a small dataframe with integer groups, dates and a missing value in every value column."""
+
+    return pd.DataFrame({
+        "x": [1, 2, 3, 1, 2, 3],
+        "y": [1.5, np.nan, 2.5, 3.0, 4.0, 1.0],
+        "group": [1, 1, 1, 2, 2, 2],
+        "label": ["a", "b", "c", "a", "b", "c"],
+        "date": pd.to_datetime(["2024-01-01", None, "2024-01-03", "2024-01-01", "2024-01-02", "2024-01-03"]),
+    })
+
+
+CHARTS = {
+    "BarChart": lambda df: dt_modules.BarChart(df, "label", "y", "group"),
+    "PieChart": lambda df: dt_modules.PieChart(df, "y", "label"),
+    "Table": lambda df: dt_modules.Table(df, page_size=4),
+    "ScatterPlot": lambda df: dt_modules.ScatterPlot(df, "x", "y"),
+    "Histogram": lambda df: dt_modules.Histogram(df, "y", nbins=3),
+    "LineChart": lambda df: dt_modules.LineChart(df, "x", "y", "group"),
+    "BoxPlot": lambda df: dt_modules.BoxPlot(df, "label", "y", "group"),
+    "HeatMap": lambda df: dt_modules.HeatMap(df, "label", "group", "y"),
+}
+
+
+def normalize(value):
+    """Returns `value` (an export read with `read_export`) as comparable plain json, missing values included."""
+
+    if isinstance(value, pd.DataFrame):
+        value = value.to_dict(orient="split")
+
+    if isinstance(value, dict):
+        # Plotly leaves out empty objects (e.g. an unset axis `title`) when it reads a figure.
+        return {str(key): normalize(item) for key, item in value.items() if not (isinstance(item, dict) and not item)}
+
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [normalize(item) for item in value]
+
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
+
+
+def dump_export(location: str) -> str:
+    """Returns the normalized contents of the export at `location`."""
+
+    return json.dumps(normalize(read_export(location)), sort_keys=True, default=str)
+
+
+def dump_traces(chart) -> str:
+    """Returns the legend group, color and values of every trace of the `chart`."""
+
+    traces = chart.get_figure().data
+    return str([(trace.legendgroup, trace.line.color, normalize(trace.x), normalize(trace.y)) for trace in traces])
+
+
+def check_append(directory: Path, options: dict) -> bool:
+    """Returns whether a loaded line chart gets the same traces and colors as the original when rows are appended."""
+
+    data = make_data()
+    new_rows = pd.DataFrame({"x": [4, 4], "y": [2.0, np.nan], "group": [1, 3], "label": ["d", "d"], "date": pd.NaT})
+    location = str(directory / "append.export.json")
+
+    dt_modules.LineChart(data, "x", "y", "group").save_json(location, **options)
+    loaded = load_export(location).append(new_rows)
+    expected = dt_modules.LineChart(pd.concat([data, new_rows]), "x", "y", "group")
+
+    return loaded.color_map == expected.color_map and dump_traces(loaded) == dump_traces(expected)
+
+
+def main() -> int:
+    failures = []
+
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+
+        for name, build in CHARTS.items():
+            for engine in ENGINES:
+                for options in FORMATS:
+                    for suffix in SUFFIXES:
+                        case = f"{name} {engine} {options} {suffix}"
+                        location = str(directory / f"chart{suffix}")
+                        again = str(directory / f"again{suffix}")
+
+                        try:
+                            build(make_data()).save_json(location, engine=engine, **options)
+                            load_export(location).save_json(again, engine=engine, **options)
+
+                            if dump_export(location) != dump_export(again):
+                                failures.append(f"{case}: the loaded chart exports different contents")
+                        except Exception:
+                            failures.append(f"{case}: {traceback.format_exc()}")
+
+        for options in FORMATS:
+            try:
+                if not check_append(directory, options):
+                    failures.append(f"LineChart.append {options}: the loaded chart appends differently")
+            except Exception:
+                failures.append(f"LineChart.append {options}: {traceback.format_exc()}")
+
+    cases = len(CHARTS) * len(ENGINES) * len(FORMATS) * len(SUFFIXES) + len(FORMATS)
+    print(f"export round trips: {cases - len(failures)} of {cases} cases passed")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+"""Guards the import time of `dt_modules` against regressions.
+
+Usage: `uv run ./benchmarks/import_time.py [--budget-ms 150] [--runs 7]`
+
+Imports `dt_modules` in fresh interpreters and fails (exit code 1) when the median import time exceeds the budget,
+or when importing it loads one of the heavy dependencies (plotly, pandas, numpy).
+"""
+
+from pathlib import Path
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HEAVY_MODULES = ("plotly", "pandas", "numpy")
+
+PROBE = """
+import sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+import json
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(module: str) -> dict:
+    """Imports `module` in a fresh interpreter and returns the import time and loaded heavy modules."""
+
+    env = dict(os.environ)
+    source = str(Path(__file__).resolve().parent.parent / "src")
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [source, env.get("PYTHONPATH")]))
+
+    output = subprocess.run(
+        [sys.executable, "-c", PROBE.format(module=module, heavy=HEAVY_MODULES)],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    ).stdout
+
+    return json.loads(output)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default="dt_modules")
+    parser.add_argument("--budget-ms", type=float, default=150.0)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args()
+
+    runs = [measure(args.module) for _ in range(args.runs)]
+    median_ms = statistics.median(run["seconds"] for run in runs) * 1000
+    loaded = sorted({module for run in runs for module in run["loaded"]})
+
+    print(f"import {args.module}: median {median_ms:.1f} ms over {args.runs} runs (budget {args.budget_ms:.0f} ms)")
+
+    failed = False
+    if median_ms > args.budget_ms:
+        print("FAIL: import time exceeds the budget")
+        failed = True
+
+    if loaded:
+        print(f"FAIL: importing {args.module} loaded {', '.join(loaded)}")
+        failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,131 @@
-import plotly.express as px
-import plotly.graph_objects as go
-
 from abc import ABC, abstractmethod
-from typing import Any
-import json
+from typing import TYPE_CHECKING, Any
+import importlib
+import os
+import re
+
+from dt_modules.coloring import Palette, default_palette, government_theme, quantitative_colors
+from dt_modules.export import encode_value, read_export, resolve_compression, save_export
+from dt_modules.profiling import Phase, PhaseTiming, Profile, add_listener, profile, remove_listener
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+
+    from dt_modules.aio import export_many_async
+    from dt_modules.batch import ExportJob, ExportResult, export_batch
+    from dt_modules.cache import ExportCache
+    from dt_modules.excel import ExcelReport, save_workbook
+    from dt_modules.images import export_images
+    from dt_modules.loading import load_export
+    from dt_modules.specs import (
+        BarChartSpec,
+        BoxPlotSpec,
+        ChartSpec,
+        HeatMapSpec,
+        HistogramSpec,
+        LineChartSpec,
+        PieChartSpec,
+        ScatterPlotSpec,
+        TableSpec,
+        chart_specs,
+    )
 
-from dt_modules.coloring import government_theme, quantitative_colors
+
+__all__ = [
+    # Charts
+    "Savable",
+    "Figure",
+    "BarChart",
+    "PieChart",
+    "Table",
+    "ScatterPlot",
+    "Histogram",
+    "LineChart",
+    "BoxPlot",
+    "HeatMap",
+    # Colors and styling
+    "Palette",
+    "default_palette",
+    "government_theme",
+    "quantitative_colors",
+    "blue_colors",
+    "rubine_red",
+    "fill",
+    "fill_default_colors",
+    "map_colors",
+    "apply_default_style",
+    "RENDER_MODES",
+    "resolve_render_mode",
+    # Exports
+    "read_export",
+    "load_export",
+    "ExportCache",
+    "ExportJob",
+    "ExportResult",
+    "export_batch",
+    "export_many_async",
+    "export_images",
+    "ExcelReport",
+    "save_workbook",
+    # Profiling
+    "Phase",
+    "PhaseTiming",
+    "Profile",
+    "add_listener",
+    "remove_listener",
+    "profile",
+    # Chart specs
+    "ChartSpec",
+    "chart_specs",
+    "BarChartSpec",
+    "PieChartSpec",
+    "TableSpec",
+    "ScatterPlotSpec",
+    "HistogramSpec",
+    "LineChartSpec",
+    "BoxPlotSpec",
+    "HeatMapSpec",
+    # Plotly, kept for compatibility
+    "px",
+    "go",
+]
+
+# Attributes which are imported on first access, so `import dt_modules` does not load plotly, pandas or multiprocessing.
+# Plotly itself is only imported when a figure is built, `dt_modules.px` and `dt_modules.go` are kept for compatibility.
+_lazy_attributes = {
+    "ExportJob": "dt_modules.batch",
+    "ExportResult": "dt_modules.batch",
+    "export_batch": "dt_modules.batch",
+    "ExportCache": "dt_modules.cache",
+    "ExcelReport": "dt_modules.excel",
+    "save_workbook": "dt_modules.excel",
+    "export_images": "dt_modules.images",
+    "export_many_async": "dt_modules.aio",
+    "load_export": "dt_modules.loading",
+    "ChartSpec": "dt_modules.specs",
+    "chart_specs": "dt_modules.specs",
+    "BarChartSpec": "dt_modules.specs",
+    "PieChartSpec": "dt_modules.specs",
+    "TableSpec": "dt_modules.specs",
+    "ScatterPlotSpec": "dt_modules.specs",
+    "HistogramSpec": "dt_modules.specs",
+    "LineChartSpec": "dt_modules.specs",
+    "BoxPlotSpec": "dt_modules.specs",
+    "HeatMapSpec": "dt_modules.specs",
+    "px": "plotly.express",
+    "go": "plotly.graph_objects",
+}
+
+
+def __getattr__(name: str):
+    if name not in _lazy_attributes:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(_lazy_attributes[name])
+    value = module if name in ("px", "go") else getattr(module, name)
+    globals()[name] = value
+
+    return value
 
 
 # TODO: remove all occurrences of these colors.
@@ -16,13 +136,7 @@ rubine_red = ["#CA005D", "#D74085", "#DF669D", "#E78CB6", "#EFB2CE", "#F7D9E7"]
 def fill(to: int, colors: list[str]) -> list[str]:
     """Creates a list filled with items form the `colors` list. Will repeat values so the new list's length will equal `to`"""
 
-    length = len(colors)
-    new_colors = []
-
-    for i in range(0, to):
-        new_colors.append(colors[i % length])
-
-    return new_colors
+    return list(Palette(colors).take(to))
 
 
 def fill_default_colors(
@@ -30,29 +144,75 @@ def fill_default_colors(
 ) -> list[str]:
     """Generates a list of colors based on a given `theme`, repeating color names and adjusting their intensity."""
 
-    length = len(color_names)
-    new_colors = []
-    used_colors = {}
+    return list(Palette.from_theme(theme, color_names).take(to))
 
-    for i in range(0, to):
-        color_name = color_names[i % length]
 
-        if color_name not in used_colors:
-            used_colors[color_name] = 100
-        else:
-            if used_colors[color_name] == 100:
-                used_colors[color_name] = 75
+def map_colors(categories, colors: list[str] | None = None) -> dict[Any, str]:
+    """Maps every unique value in `categories` (in order of appearance) to a color from `colors` or the default palette."""
+
+    categories = categories.unique().tolist()
+    palette = default_palette if colors is None else Palette(colors)
+
+    return dict(zip(categories, palette.take(len(categories))))
+
+
+def _color_map_parameter(color_map: dict[Any, str]) -> dict[str, str]:
+    """Returns `color_map` with the categories as strings, the names plotly gives their legend groups."""
+
+    return {str(category): color for category, color in color_map.items()}
+
+
+def _downsample(data, x: str, y: str, max_points: int | None, group: str | None, method: str):
+    """Downsamples `data` to `max_points` per `group`, returns the data and a description of the reduction (or `None`)."""
+
+    if max_points is None:
+        return data, None
+
+    from dt_modules.aggregation import downsample
 
-            elif used_colors[color_name] == 15:
-                used_colors[color_name] == 100
+    reduced = downsample(data, x, y, max_points, group, method)
+    downsampling = {
+        "method": method,
+        "maxPoints": max_points,
+        "originalLength": data.shape[0],
+        "length": reduced.shape[0],
+    }
 
-            else:
-                used_colors[color_name] -= 15
+    return reduced, downsampling
 
-        percentage = used_colors[color_name]
-        new_colors.append(theme[color_name][percentage])
 
-    return new_colors
+# Render modes of scatter and line traces, "auto" uses WebGL above the point threshold (like plotly express does).
+RENDER_MODES = ("auto", "svg", "webgl")
+
+
+def resolve_render_mode(render_mode: str, points: int, webgl_threshold: int = 1000) -> str:
+    """Returns "svg" or "webgl" for the given `render_mode` and number of `points`."""
+
+    if render_mode not in RENDER_MODES:
+        raise ValueError(f"Unknown render mode '{render_mode}', expected one of {RENDER_MODES}.")
+
+    if render_mode == "auto":
+        return "webgl" if points > webgl_threshold else "svg"
+
+    return render_mode
+
+
+# Chart attributes which are exported under a different name than the camelCase of the attribute, `None` when the
+# parameter is not stored on the chart, see `Figure.from_export`.
+_parameter_attributes = {
+    "chartType": None,
+    "columns": None,
+    "pagination": None,
+    "dataframe": "data",
+    "prebinned": "prebin",
+    "aggregated": "aggregate",
+}
+
+
+def _is_chunked(data: Any) -> bool:
+    """Returns whether `data` is a csv/parquet path or an iterator of dataframe chunks, see `dt_modules.streaming`."""
+
+    return isinstance(data, (str, os.PathLike)) or hasattr(data, "__next__")
 
 
 def apply_default_style(figure):
@@ -81,11 +241,20 @@ class Savable(ABC):
 
 
 class Figure(Savable):
-    """Holds the plotly figure."""
+    """Holds the plotly figure.
+
+    Chart classes only store their settings and implement `build_figure`, the plotly figure is built (and styled)
+    the first time it is needed and then reused.
+    """
+
+    # Key under which `get_parameters` is stored in the export file.
+    parameters_key = "parameters"
 
-    def __init__(self, figure):
-        self.figure = figure
-        apply_default_style(self.figure)
+    def __init__(self, figure=None):
+        self._figure = figure
+
+        if figure is not None:
+            apply_default_style(figure)
 
     @classmethod
     def figure(cls, figure):
@@ -93,11 +262,178 @@ class Figure(Savable):
 
         return Figure(figure)
 
+    @classmethod
+    def from_export(cls, parameters: dict, figure):
+        """Returns a chart with the settings of exported `parameters` and the exported plotly `figure`, see `load_export`.
+
+        The figure is used as it is, so plotly express does not run again.
+        """
+
+        chart = cls.__new__(cls)
+        chart._figure = figure
+        chart.kwargs = {}
+
+        for key, value in parameters.items():
+            name = _parameter_attributes.get(key, re.sub(r"(?<!^)(?=[A-Z])", "_", key).lower())
+
+            if name is not None:
+                setattr(chart, name, value)
+
+        color_map = getattr(chart, "color_map", None)
+        data = getattr(chart, "data", None)
+        column = getattr(chart, "column_to_color", None)
+
+        if color_map is not None and hasattr(data, "columns") and column in data.columns:
+            # The exported categories are strings, map them back to the (e.g. integer) values in the data.
+            categories = {str(category): category for category in data[column].unique().tolist()}
+            chart.color_map = {categories.get(key, key): color for key, color in color_map.items()}
+
+        return chart
+
+    def build_figure(self):
+        """Builds the plotly figure, called once by `get_figure`."""
+
+        raise NotImplementedError(f"{type(self).__name__} does not define a figure.")
+
     def get_figure(self):
-        return self.figure
+        if self._figure is None:
+            with Phase("build_figure", self):
+                figure = self.build_figure()
+
+            with Phase("apply_default_style", self):
+                apply_default_style(figure)
+
+            self._figure = figure
+
+        return self._figure
+
+    def get_parameters(self) -> dict:
+        """Returns the parameters the data portal needs to rebuild the figure."""
+
+        raise NotImplementedError(f"{type(self).__name__} does not define export parameters.")
+
+    def save_json(
+        self,
+        location: str,
+        engine: str | None = None,
+        data_format: str = "dict",
+        binary: bool = True,
+        cache: "ExportCache | None" = None,
+        compression: str | None = None,
+        level: int | None = None,
+    ):
+        """Saves a json representation of the current figure, which can be uploaded to the data portal.
+
+        The `engine` selects the JSON encoder: "json" (default), "orjson" or "auto" (orjson when installed).
+        The "columnar" `data_format` stores the dataframe once, per column, see `dt_modules.columnar`, "sidecar" also
+        writes the numeric arrays to a binary `.bin` file next to `location`, see `dt_modules.sidecar`.
+        With a `cache` an unchanged chart is copied from the cache, without building or serializing the figure.
+        Sidecar exports are not cached.
+        The export is compressed while it is written with `compression` ("gzip" or "zstd") at the given `level`, by
+        default when `location` ends with `.gz` or `.zst`, e.g. `chart.export.json.gz`. `read_export` reads them back.
+        """
+
+        if data_format == "sidecar":
+            cache = None
+
+        if cache is not None:
+            key = cache.key(
+                self,
+                format="json",
+                engine=engine,
+                data_format=data_format,
+                binary=binary,
+                compression=resolve_compression(location, compression),
+                level=level,
+            )
+
+            if cache.fetch(key, location):
+                return
+
+        with Phase("save_json", self, location):
+            save_export(
+                location,
+                self.parameters_key,
+                self.get_parameters(),
+                self.get_figure(),
+                engine,
+                data_format,
+                binary,
+                compression,
+                level,
+            )
+
+        if cache is not None:
+            cache.store(key, location)
+
+    async def save_json_async(self, location: str, executor: "Executor | None" = None, **save_kwargs):
+        """Saves the export like `save_json`, on the `executor` (a thread pool by default) instead of the event loop.
+
+        Use `export_many_async` to save many charts with a limited concurrency.
+        """
+
+        from dt_modules.aio import save_json_async
+
+        await save_json_async(self, location, executor, **save_kwargs)
+
+    def save_image(
+        self,
+        location: str,
+        format: str | None = None,
+        width: int | None = None,
+        height: int | None = None,
+        scale: float | None = None,
+    ) -> int:
+        """Saves a static image (png, svg, pdf, ...) of the figure with Kaleido, returns the file size.
+
+        The default font must be installed for Kaleido to use it. Use `export_images` to render many figures.
+        """
+
+        from dt_modules.images import save_image
+
+        with Phase("save_image", self, location):
+            return save_image(self, location, format, width, height, scale)
+
+    def save_excel(
+        self,
+        location: str,
+        format: str | None = None,
+        sheet_name: str = "data",
+        trace_memory: bool = False,
+    ) -> "ExcelReport":
+        """Saves the data of the chart as xlsx (streamed), csv or parquet, by the extension of `location`.
+
+        Returns an `ExcelReport` with the duration, file size and (with `trace_memory`) the peak memory use.
+        Use `save_workbook` to save several charts to one workbook.
+        """
+
+        from dt_modules.excel import save_workbook
+
+        with Phase("save_excel", self, location):
+            return save_workbook({sheet_name: self.get_data()}, location, format, trace_memory)
+
+    def get_data(self):
+        """Returns the dataframe of the chart, which `save_excel` saves."""
+
+        return self.data
+
+    def save_parameters(self, location: str, engine: str | None = None):
+        """Saves only the parameters of the figure, without building the plotly figure."""
+
+        with Phase("save_parameters", self, location), open(location, "wb") as f:
+            f.write(encode_value({self.parameters_key: self.get_parameters()}, engine))
 
 
 class BarChart(Figure):
+    """Bar chart of `y` per `x`, colored by `column_to_color`.
+
+    `data` can also be a csv/parquet path or an iterator of dataframe chunks, then only the sums of `y` per bar
+    are computed in one pass over the chunks and kept.
+    """
+
+    # Settings of charts loaded from exports which do not store them, see `Figure.from_export`.
+    streamed = False
+
     def __init__(
         self,
         data: Any,
@@ -107,94 +443,120 @@ class BarChart(Figure):
         colors: list[str] | None = None,
         **kwargs,
     ):
-        if colors is None:
-            colors = fill_default_colors(
-                len(data[x]), government_theme, quantitative_colors
-            )
-        else:
-            colors = fill(len(data[x]), colors)
-
-        figure = px.bar(
-            data,
-            x=x,
-            y=y,
-            color=data[column_to_color],
-            color_discrete_sequence=colors,
-            **kwargs,
-        )
+        self.streamed = _is_chunked(data)
+
+        if self.streamed:
+            from dt_modules.streaming import group_sums, iter_chunks
+
+            data = group_sums(iter_chunks(data, [x, column_to_color, y]), [x, column_to_color], y)
 
         self.data = data
-        self.colors = colors
+        self.color_map = map_colors(data[column_to_color], colors)
+        self.colors = tuple(self.color_map.values())
         self.column_to_color = column_to_color
         self.x = x
         self.y = y
-        super().__init__(figure)
+        self.kwargs = kwargs
+        super().__init__()
+
+    def build_figure(self):
+        import plotly.express as px
+
+        return px.bar(
+            self.data,
+            x=self.x,
+            y=self.y,
+            color=self.data[self.column_to_color],
+            color_discrete_sequence=self.colors,
+            color_discrete_map=self.color_map,
+            **self.kwargs,
+        )
 
-    def save_json(self, location: str):
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "bar",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "length": self.data.shape[0],
             "columns": list(self.data.columns),
             "colors": self.colors,
+            "colorMap": _color_map_parameter(self.color_map),
             "columnToColor": self.column_to_color,
             "x": self.x,
             "y": self.y,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
+        if self.streamed:
+            parameters["streamed"] = True
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
+        return parameters
 
 
 class PieChart(Figure):
     def __init__(
         self, data, values: str, names: str, colors: list[str] = None, **kwargs
     ):
-        length = len(values)
-
-        if colors is None:
-            colors = fill_default_colors(length, government_theme, quantitative_colors)
-        else:
-            colors = fill(length, colors)
-
-        figure = px.pie(
-            data,
-            values=values,
-            names=names,
-            color=data[names],
-            color_discrete_sequence=colors,
-            **kwargs,
-        )
-
         self.data = data
-        self.colors = colors
+        self.color_map = map_colors(data[names], colors)
+        self.colors = tuple(self.color_map.values())
         self.column_to_color = names
         self.x = values
         self.y = names
-        super().__init__(figure)
+        self.kwargs = kwargs
+        super().__init__()
+
+    def build_figure(self):
+        import plotly.express as px
+
+        return px.pie(
+            self.data,
+            values=self.x,
+            names=self.y,
+            color=self.data[self.y],
+            color_discrete_sequence=self.colors,
+            color_discrete_map=self.color_map,
+            **self.kwargs,
+        )
 
-    def save_json(self, location: str):
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "pie",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "length": self.data.shape[0],
             "columns": list(self.data.columns),
             "colors": self.colors,
+            "colorMap": _color_map_parameter(self.color_map),
             "columnToColor": self.column_to_color,
             "x": self.x,
             "y": self.y,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
+        return parameters
+
+def _cell_values(column) -> list:
+    """Returns the values of a table column as a list, missing values become `None` like in the plotly figure."""
+
+    import pandas as pd
+
+    if getattr(column, "dtype", None) is None:
+        return [None if (isinstance(value, float) and value != value) or value is pd.NaT else value for value in column]
+
+    # `tolist` of datetime64[ns] arrays gives integers, a series gives timestamps.
+    if column.dtype.kind in "Mm" or pd.isna(column).any():
+        column = pd.Series(column)
+        column = column.astype(object).where(column.notna(), None)
+
+    return column.tolist()
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
 
 class Table(Figure):
+    """Table of the `cells` (a list of columns) under the `headers`, or of a dataframe passed as `headers`.
+
+    With a `page_size` the figure only shows the first page and `save_json` also writes every page of rows to its own
+    file next to the export, named `<export name>.page-<n>.json`, which the portal loads on demand.
+    """
+
+    parameters_key = "portalData"
+
     def __init__(
         self,
         headers=None,
@@ -204,117 +566,306 @@ class Table(Figure):
         line_color="darkslategray",
         alternate_row=False,
         background_color="white",
+        page_size: int | None = None,
         **kwargs,
     ):
-        row_colors = background_color
-        if alternate_row:
-            row_amount = len(cells[0])
-            row_colors = [[background_color, cells_color] * row_amount]
+        if hasattr(headers, "columns"):
+            self.data = headers
+            headers = [str(column) for column in self.data.columns]
+            cells = [self.data[column] for column in self.data.columns]
+
+        if page_size is not None and page_size < 1:
+            raise ValueError(f"The page size must be positive, got {page_size}.")
+
+        self.headers = headers
+        self.cells = cells
+        self.header_color = header_color
+        self.cells_color = cells_color
+        self.line_color = line_color
+        self.alternate_row = alternate_row
+        self.background_color = background_color
+        self.page_size = page_size
+        self.kwargs = kwargs
+        super().__init__()
+
+    def get_data(self):
+        """Returns the table as a dataframe, built from the `headers` and `cells` when the table was not given one."""
+
+        if "data" in vars(self):
+            return self.data
+
+        import pandas as pd
+
+        data = pd.DataFrame({i: _cell_values(column) for i, column in enumerate(self.cells or [])})
+        data.columns = list(self.headers or [])[: data.shape[1]]
+
+        return data
 
-        figure = go.Figure(
+    @property
+    def row_count(self) -> int:
+        return len(self.cells[0]) if self.cells else 0
+
+    @property
+    def page_count(self) -> int:
+        return -(-self.row_count // self.page_size) if self.page_size else 1
+
+    def get_page(self, page: int) -> list[list]:
+        """Returns the cell values (per column) of the rows on `page`, counting from 0."""
+
+        if self.page_size is None:
+            start, stop = 0, self.row_count
+        else:
+            start, stop = page * self.page_size, (page + 1) * self.page_size
+
+        columns = [column.iloc[start:stop] if hasattr(column, "iloc") else column[start:stop] for column in self.cells]
+        return [_cell_values(column) for column in columns]
+
+    def build_figure(self):
+        import plotly.graph_objects as go
+
+        cells = self.get_page(0) if self.cells is not None else None
+
+        row_colors = self.background_color
+        if self.alternate_row:
+            row_colors = [fill(len(cells[0]), [self.background_color, self.cells_color])]
+
+        return go.Figure(
             data=[
                 go.Table(
                     header=dict(
-                        values=headers,
-                        line_color=line_color,
-                        fill_color=header_color,
-                        font=dict(color=background_color),
+                        values=self.headers,
+                        line_color=self.line_color,
+                        fill_color=self.header_color,
+                        font=dict(color=self.background_color),
                     ),
                     cells=dict(
                         values=cells,
-                        line_color=line_color,
+                        line_color=self.line_color,
                         fill_color=row_colors,
                     ),
                 )
             ],
-            **kwargs,
+            **self.kwargs,
         )
 
-        self.headers = headers
-        super().__init__(figure)
-
-    def save_json(self, location: str):
+    def get_parameters(self) -> dict:
         portal_data = {
             "chartType": "table",
             "columns": list(self.headers),
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "portalData": portal_data, "figureContents": figure_contents }
+        if self.page_size is not None:
+            portal_data["pagination"] = {
+                "pageSize": self.page_size,
+                "pageCount": self.page_count,
+                "rowCount": self.row_count,
+            }
+
+        return portal_data
+
+    @classmethod
+    def from_export(cls, parameters: dict, figure):
+        """Returns a table with the headers, cells (of the first page) and colors of the exported `figure`."""
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
+        chart = super().from_export(parameters, figure)
+        trace = figure.data[0]
+        fill_color = trace.cells.fill.color
+
+        chart.headers = list(parameters["columns"])
+        chart.cells = [list(column) for column in trace.cells.values]
+        chart.header_color = trace.header.fill.color
+        chart.line_color = trace.cells.line.color
+        chart.alternate_row = isinstance(fill_color, (list, tuple))
+        chart.background_color = fill_color[0][0] if chart.alternate_row else fill_color
+        chart.cells_color = fill_color[0][1] if chart.alternate_row and len(fill_color[0]) > 1 else blue_colors[4]
+        chart.page_size = (parameters.get("pagination") or {}).get("pageSize")
+
+        return chart
+
+    def save_json(
+        self,
+        location: str,
+        engine: str | None = None,
+        data_format: str = "dict",
+        binary: bool = True,
+        cache: "ExportCache | None" = None,
+        compression: str | None = None,
+        level: int | None = None,
+    ):
+        """Saves the export like `Figure.save_json`, and the pages of rows when the table is paginated."""
+
+        super().save_json(location, engine, data_format, binary, cache, compression, level)
+
+        if self.page_size is not None:
+            with Phase("save_pages", self):
+                self.save_pages(location, engine, compression, level)
+
+    def save_pages(
+        self, location: str, engine: str | None = None, compression: str | None = None, level: int | None = None
+    ) -> list[str]:
+        """Writes every page of rows to its own file next to the export at `location`, returns the page files.
+
+        The pages are compressed like the export, see `dt_modules.export.page_location` for their names.
+        """
+
+        from dt_modules.export import open_export, page_location
+
+        locations = []
+
+        for page in range(self.page_count):
+            page_file = str(page_location(location, page))
+            start = page * self.page_size
+
+            with open_export(page_file, "wb", compression, level) as f:
+                f.write(encode_value({
+                    "page": page,
+                    "rows": [start, min(start + self.page_size, self.row_count)],
+                    "values": self.get_page(page),
+                }, engine))
+
+            locations.append(page_file)
+
+        return locations
 
 
 class ScatterPlot(Figure):
-    def __init__(self, data, x: str, y: str, colors: list = None, **kwargs):
+    """Scatter plot of `y` against `x`.
+
+    With `max_points` the data is downsampled (see `dt_modules.aggregation.downsample`) before it is plotted and
+    exported, the reduction is recorded in the `downsampling` parameter.
+    The `render_mode` ("svg", "webgl" or "auto": WebGL above `webgl_threshold` points) is recorded in `renderMode`.
+    """
+
+    # Settings of charts loaded from exports which do not store them, see `Figure.from_export`.
+    downsampling = None
+
+    def __init__(self, data, x: str, y: str, colors: list = None, max_points: int | None = None, downsample: str = "lttb", render_mode: str = "auto", webgl_threshold: int = 1000, **kwargs):
         if colors is None:
-            colors = fill_default_colors(
-                1, government_theme, quantitative_colors
-            )
+            colors = default_palette.take(1)
 
-        figure = px.scatter(
-            x=data[x],
-            y=data[y],
-            color_discrete_sequence=colors,
-            **kwargs,
-        )
+        data, self.downsampling = _downsample(data, x, y, max_points, None, downsample)
+        self.render_mode = resolve_render_mode(render_mode, data.shape[0], webgl_threshold)
 
         self.data = data
         self.colors = colors
         self.x = x
         self.y = y
-        super().__init__(figure)
+        self.kwargs = kwargs
+        super().__init__()
+
+    def build_figure(self):
+        import plotly.express as px
+
+        return px.scatter(
+            x=self.data[self.x],
+            y=self.data[self.y],
+            color_discrete_sequence=self.colors,
+            render_mode=self.render_mode,
+            **self.kwargs,
+        )
 
-    def save_json(self, location: str):
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "scatter",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "length": self.data.shape[0],
             "colors": self.colors,
             "columns": [self.x, self.y],
             "x": self.x,
             "y": self.y,
+            "renderMode": self.render_mode,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
+        if self.downsampling is not None:
+            parameters["downsampling"] = self.downsampling
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
+        return parameters
 
 
 class Histogram(Figure):
-    def __init__(self, data, x: str, nbins: int = 10, colors: list = None, x_label: str = None, y_label: str = None, **kwargs):
+    """Histogram of the `x` column.
+
+    With `prebin=True` the `nbins` equal width bins are counted during construction. Only the bin table is kept
+    (as `data`) and exported, the figure is a bar chart of the counts, so the export no longer grows with the data.
+    The other `kwargs` are then passed to `px.bar` instead of `px.histogram`.
+
+    `data` can also be a csv/parquet path or an iterator of dataframe chunks, which are always prebinned while
+    streaming over them. The bins span `bin_range`, paths are read twice to find the range when it is not given.
+    """
+
+    # Settings of charts loaded from exports which do not store them, see `Figure.from_export`.
+    prebin = False
+    streamed = False
+
+    def __init__(self, data, x: str, nbins: int = 10, colors: list = None, x_label: str = None, y_label: str = None, prebin: bool = False, bin_range: tuple[float, float] | None = None, **kwargs):
         if colors is None:
             colors = [government_theme["Lintblauw"][100]]
 
-        figure = px.histogram(
-            data,
-            x=x,
-            nbins=nbins,
-            color_discrete_sequence=colors,
-            **kwargs,
-        )
+        self.streamed = _is_chunked(data)
 
-        # Set axis labels.
-        figure.update_layout(
-            xaxis_title=x_label or x,
-            yaxis_title=y_label
-        )
+        if self.streamed:
+            from dt_modules.streaming import bin_counts, iter_chunks, value_range
+
+            if bin_range is None:
+                if hasattr(data, "__next__"):
+                    raise ValueError("Pass a `bin_range` to stream an iterator of chunks, it can only be read once.")
+
+                bin_range = value_range(iter_chunks(data, [x]), x)
+
+            data = bin_counts(iter_chunks(data, [x]), x, nbins, bin_range)
+            prebin = True
+        elif prebin:
+            from dt_modules.aggregation import histogram_bins
+
+            data = histogram_bins(data[x], nbins)
 
         self.data = data
         self.colors = colors
         self.nbins = nbins
+        self.prebin = prebin
         self.x = x
         self.x_label = x_label or x
         self.y_label = y_label
-        super().__init__(figure)
+        self.kwargs = kwargs
+        super().__init__()
+
+    def build_figure(self):
+        import plotly.express as px
+
+        if self.prebin:
+            figure = px.bar(
+                x=(self.data["start"] + self.data["end"]) / 2,
+                y=self.data["count"],
+                color_discrete_sequence=self.colors,
+                **self.kwargs,
+            )
+            figure.update_traces(
+                width=self.data["end"] - self.data["start"],
+                customdata=self.data[["start", "end"]],
+                hovertemplate="%{customdata[0]} - %{customdata[1]}<br>count=%{y}<extra></extra>",
+            )
+            figure.update_layout(bargap=0)
+        else:
+            figure = px.histogram(
+                self.data,
+                x=self.x,
+                nbins=self.nbins,
+                color_discrete_sequence=self.colors,
+                **self.kwargs,
+            )
 
-    def save_json(self, location: str):
+        # Set axis labels.
+        figure.update_layout(
+            xaxis_title=self.x_label,
+            yaxis_title=self.y_label
+        )
+
+        return figure
+
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "histogram",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "columns": list(self.data.columns),
             "nbins": self.nbins,
             "colors": self.colors,
@@ -323,124 +874,368 @@ class Histogram(Figure):
             "yLabel": self.y_label,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
+        if self.prebin:
+            parameters["prebinned"] = True
+
+        if self.streamed:
+            parameters["streamed"] = True
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
+        return parameters
 
 
 class LineChart(Figure):
-    def __init__(self, data, x: str, y: str, column_to_color: str, colors: list = None, **kwargs):
-        if colors is None:
-            colors = fill_default_colors(
-                len(data[y]), government_theme, quantitative_colors
-            )
+    """Line chart of `y` against `x`, a line per `column_to_color` group.
 
-        figure = px.line(
-            data,
-            x=x,
-            y=y,
-            color=column_to_color,
-            color_discrete_sequence=colors,
-            **kwargs,
-        )
+    With `max_points` every group is downsampled (see `dt_modules.aggregation.downsample`) before it is plotted and
+    exported, the reduction is recorded in the `downsampling` parameter.
+    The `render_mode` ("svg", "webgl" or "auto": WebGL above `webgl_threshold` points) is recorded in `renderMode`.
+    Use `append` to add new rows to an existing chart without building it again.
+    """
+
+    # Settings of charts loaded from exports which do not store them, see `Figure.from_export`.
+    downsampling = None
+    palette = default_palette
+
+    def __init__(self, data, x: str, y: str, column_to_color: str, colors: list = None, max_points: int | None = None, downsample: str = "lttb", render_mode: str = "auto", webgl_threshold: int = 1000, **kwargs):
+        data, self.downsampling = _downsample(data, x, y, max_points, column_to_color, downsample)
+        self.render_mode = resolve_render_mode(render_mode, data.shape[0], webgl_threshold)
 
         self.data = data
-        self.length = data[column_to_color].unique().shape[0]
-        self.colors = colors
+        self.palette = default_palette if colors is None else Palette(colors)
+        self.color_map = map_colors(data[column_to_color], self.palette)
+        self.length = len(self.color_map)
+        self.colors = tuple(self.color_map.values())
         self.column_to_color = column_to_color
         self.x = x
         self.y = y
-        super().__init__(figure)
+        self.kwargs = kwargs
+        super().__init__()
+
+    def build_figure(self):
+        import plotly.express as px
+
+        return px.line(
+            self.data,
+            x=self.x,
+            y=self.y,
+            color=self.column_to_color,
+            color_discrete_sequence=self.colors,
+            color_discrete_map=self.color_map,
+            render_mode=self.render_mode,
+            **self.kwargs,
+        )
 
-    def save_json(self, location: str):
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "line",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "length": self.length,
             "columns": list(self.data.columns),
             "colors": self.colors,
+            "colorMap": _color_map_parameter(self.color_map),
             "columnToColor": self.column_to_color,
             "x": self.x,
             "y": self.y,
+            "renderMode": self.render_mode,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
+        if self.downsampling is not None:
+            parameters["downsampling"] = self.downsampling
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
+        return parameters
 
+    def append(self, new_rows, delta_location: str | None = None, engine: str | None = None) -> "LineChart":
+        """Appends `new_rows` to the chart. Returns the chart itself.
 
-class BoxPlot(Figure):
-    def __init__(self, data, x: str, y: str, column_to_color: str, colors: list = None, **kwargs):
-        length = data[column_to_color].unique().shape[0]
+        When the figure was already built, only the traces of the groups in `new_rows` are extended (new groups get a
+        new trace). With a `delta_location` a patch holding only the new rows is written, see `save_delta`.
+        The new rows are not downsampled.
+        """
 
-        if colors is None:
-            colors = fill_default_colors(
-                length, government_theme, quantitative_colors
-            )
+        import pandas as pd
+
+        self.data = pd.concat([self.data, new_rows])
+
+        categories = pd.concat([pd.Series(list(self.color_map), dtype=object), new_rows[self.column_to_color]])
+        self.color_map = map_colors(categories, self.palette)
+        self.length = len(self.color_map)
+        self.colors = tuple(self.color_map.values())
+
+        if self.downsampling is not None:
+            self.downsampling = dict(self.downsampling)
+            self.downsampling["originalLength"] += new_rows.shape[0]
+            self.downsampling["length"] += new_rows.shape[0]
+
+        if self._figure is not None:
+            self._extend_traces(new_rows)
 
-        figure = px.box(
-            data,
-            x=x,
-            y=y,
-            color=column_to_color,
-            color_discrete_sequence=colors,
-            **kwargs,
+        if delta_location is not None:
+            self.save_delta(delta_location, new_rows, engine)
+
+        return self
+
+    def _extend_traces(self, new_rows):
+        """Extends the traces of the built figure with `new_rows`, per group."""
+
+        import numpy as np
+        import plotly.express as px
+
+        # Build the (small) figure of the new rows, so new traces are styled like the existing ones.
+        update = px.line(
+            new_rows,
+            x=self.x,
+            y=self.y,
+            color=self.column_to_color,
+            color_discrete_sequence=self.colors,
+            color_discrete_map=self.color_map,
+            render_mode=self.render_mode,
+            **self.kwargs,
         )
+        traces = {trace.legendgroup: trace for trace in self._figure.data}
+
+        for trace in update.data:
+            existing = traces.get(trace.legendgroup)
+
+            if existing is None:
+                self._figure.add_trace(trace)
+                continue
+
+            existing.x = np.concatenate([existing.x, trace.x])
+            existing.y = np.concatenate([existing.y, trace.y])
+
+    def save_delta(self, location: str, new_rows, engine: str | None = None):
+        """Saves a patch for an export of this chart, which appends `new_rows`.
+
+        The patch holds the updated `parameters` (without the dataframe), the new `rows` and per trace (keyed by the
+        `column_to_color` value, the trace's legend group) the `x` and `y` values to append.
+        """
+
+        parameters = self.get_parameters()
+        del parameters["dataframe"]
+        parameters["appendedRows"] = new_rows.shape[0]
+
+        traces = {
+            str(group): {"x": rows[self.x].tolist(), "y": rows[self.y].tolist()}
+            for group, rows in new_rows.groupby(self.column_to_color, sort=False)
+        }
+
+        with open(location, "wb") as f:
+            f.write(encode_value({"parameters": parameters, "rows": new_rows, "traces": traces}, engine))
+
+
+class BoxPlot(Figure):
+    """Box plot of `y` per `x` and `column_to_color` group.
+
+    With `aggregate=True` the quartiles, fences and outliers of every box are computed during construction. Only
+    those statistics (as `data`) and the `outliers` are kept and exported, so the export no longer grows with the data.
+
+    `data` can also be a csv/parquet path or an iterator of dataframe chunks, which are always aggregated while
+    streaming over them. The statistics are then estimated from a sample of `sample_size` values per box, see
+    `dt_modules.streaming.box_sketch`.
+    """
+
+    # Settings of charts loaded from exports which do not store them, see `Figure.from_export`.
+    aggregate = False
+    outliers = None
+    streamed = False
+
+    def __init__(self, data, x: str, y: str, column_to_color: str, colors: list = None, aggregate: bool = False, sample_size: int = 10_000, **kwargs):
+        self.streamed = _is_chunked(data)
+        self.outliers = None
+
+        if self.streamed:
+            from dt_modules.streaming import box_sketch, iter_chunks
+
+            data, self.outliers = box_sketch(iter_chunks(data, [column_to_color, x, y]), x, y, column_to_color, sample_size)
+            aggregate = True
+
+        self.color_map = map_colors(data[column_to_color], colors)
+
+        if aggregate and not self.streamed:
+            from dt_modules.aggregation import box_statistics
+
+            data, self.outliers = box_statistics(data, x, y, column_to_color)
 
         self.data = data
-        self.length = length
-        self.colors = colors
+        self.aggregate = aggregate
+        self.length = len(self.color_map)
+        self.colors = tuple(self.color_map.values())
         self.column_to_color = column_to_color
         self.x = x
         self.y = y
-        super().__init__(figure)
+        self.kwargs = kwargs
+        super().__init__()
+
+    def build_figure(self):
+        if self.aggregate:
+            return self._build_aggregated_figure()
+
+        import plotly.express as px
+
+        return px.box(
+            self.data,
+            x=self.x,
+            y=self.y,
+            color=self.column_to_color,
+            color_discrete_sequence=self.colors,
+            color_discrete_map=self.color_map,
+            **self.kwargs,
+        )
 
-    def save_json(self, location: str):
+    def _build_aggregated_figure(self):
+        """Builds a box trace per group from the precomputed statistics, with the outliers as markers."""
+
+        import plotly.graph_objects as go
+
+        figure = go.Figure(**self.kwargs)
+        statistics = self.data.groupby(self.column_to_color, sort=False)
+        outliers = dict(list(self.outliers.groupby(self.column_to_color, sort=False)))
+
+        for group, boxes in statistics:
+            color = self.color_map.get(group)
+
+            figure.add_trace(go.Box(
+                name=str(group),
+                legendgroup=str(group),
+                offsetgroup=str(group),
+                x=boxes[self.x],
+                q1=boxes["q1"],
+                median=boxes["median"],
+                q3=boxes["q3"],
+                lowerfence=boxes["lowerfence"],
+                upperfence=boxes["upperfence"],
+                marker_color=color,
+                boxpoints=False,
+            ))
+
+            if group in outliers:
+                figure.add_trace(go.Scatter(
+                    name=str(group),
+                    legendgroup=str(group),
+                    offsetgroup=str(group),
+                    showlegend=False,
+                    mode="markers",
+                    x=outliers[group][self.x],
+                    y=outliers[group][self.y],
+                    marker_color=color,
+                ))
+
+        # Like plotly express, boxes for different groups on the same x are drawn next to each other.
+        mode = "overlay" if self.x == self.column_to_color else "group"
+        figure.update_layout(
+            boxmode=mode,
+            scattermode=mode,
+            xaxis_title=self.x,
+            yaxis_title=self.y,
+            legend_title=self.column_to_color,
+        )
+
+        return figure
+
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "box",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "columns": list(self.data.columns),
             "length": self.length,
             "colors": self.colors,
+            "colorMap": _color_map_parameter(self.color_map),
             "columnToColor": self.column_to_color,
             "x": self.x,
             "y": self.y,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
+        if self.aggregate:
+            parameters["aggregated"] = True
+            parameters["outliers"] = self.outliers
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
+        if self.streamed:
+            parameters["streamed"] = True
+
+        return parameters
 
 
 class HeatMap(Figure):
-    def __init__(self, data, x: str, y: str, value_column: str, color_continuous_scale: str | list = None, **kwargs):
+    """Heatmap of `value_column`, with `x` as rows and `y` as columns.
+
+    Cells with several values are combined with `aggfunc` (e.g. "mean" or "sum", see `dt_modules.aggregation.pivot_grid`),
+    without it duplicate cells are an error. The grid is stored as `dtype`, "float32" halves the size of the exported
+    `z` matrix. Grids larger than `max_resolution` (rows, columns) are reduced by averaging blocks of cells.
+
+    `data` can also be a csv/parquet path or an iterator of dataframe chunks, then only one row per cell is computed
+    in one pass over the chunks and kept, see `dt_modules.streaming.pivot_cells` for the supported `aggfunc`.
+    """
+
+    # Settings of charts loaded from exports which do not store them, see `Figure.from_export`.
+    aggfunc = None
+    dtype = "float64"
+    max_resolution = None
+    streamed = False
+
+    def __init__(
+        self,
+        data,
+        x: str,
+        y: str,
+        value_column: str,
+        color_continuous_scale: str | list = None,
+        aggfunc: str | None = None,
+        dtype: str = "float64",
+        max_resolution: tuple[int, int] | None = None,
+        **kwargs,
+    ):
         if color_continuous_scale is None:
             color_continuous_scale = "Viridis"
 
-        heatmap_data = data.pivot(index=x, columns=y, values=value_column)
-        figure = px.imshow(
-            heatmap_data,
-            labels=dict(x=x, y=y, color=value_column),
-            color_continuous_scale=color_continuous_scale,
-        )
+        if dtype not in ("float32", "float64"):
+            raise ValueError(f"Unsupported heatmap dtype '{dtype}', expected 'float32' or 'float64'.")
+
+        self.streamed = _is_chunked(data)
+
+        if self.streamed:
+            from dt_modules.streaming import iter_chunks, pivot_cells
+
+            data = pivot_cells(iter_chunks(data, [x, y, value_column]), x, y, value_column, aggfunc)
 
         self.data = data
         self.x = x
         self.y = y
         self.value_column = value_column
         self.color_continuous_scale = color_continuous_scale
-        super().__init__(figure)
+        self.aggfunc = aggfunc
+        self.dtype = dtype
+        self.max_resolution = max_resolution
+        self.kwargs = kwargs
+        super().__init__()
 
-    def save_json(self, location: str):
+    def get_grid(self):
+        """Returns the (downsampled) grid of values shown by the heatmap."""
+
+        from dt_modules.aggregation import downsample_grid, pivot_grid
+
+        # Streamed data already holds one aggregated row per cell, aggregating it again would turn counts into ones.
+        aggfunc = None if self.streamed else self.aggfunc
+        grid = pivot_grid(self.data, self.x, self.y, self.value_column, aggfunc, self.dtype)
+
+        if self.max_resolution is not None:
+            grid = downsample_grid(grid, *self.max_resolution)
+
+        return grid
+
+    def build_figure(self):
+        import plotly.express as px
+
+        return px.imshow(
+            self.get_grid(),
+            labels=dict(x=self.x, y=self.y, color=self.value_column),
+            color_continuous_scale=self.color_continuous_scale,
+            **self.kwargs,
+        )
+
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "heatmap",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "length": self.data.shape[0],
             "columns": list(self.data.columns),
             "x": self.x,
@@ -449,8 +1244,16 @@ class HeatMap(Figure):
             "colorContinuousScale": self.color_continuous_scale,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
+        if self.aggfunc is not None:
+            parameters["aggfunc"] = self.aggfunc
+
+        if self.dtype != "float64":
+            parameters["dtype"] = self.dtype
+
+        if self.max_resolution is not None:
+            parameters["maxResolution"] = list(self.max_resolution)
+
+        if self.streamed:
+            parameters["streamed"] = True
 
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
\ No newline at end of file
+        return parameters
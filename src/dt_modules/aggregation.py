@@ -0,0 +1,226 @@
+import numpy as np
+import pandas as pd
+
+
+def histogram_bins(values, nbins: int) -> pd.DataFrame:
+    """Counts `values` in `nbins` equal width bins, returns a table with the `start`, `end` and `count` of every bin."""
+
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+
+    counts, edges = np.histogram(values, bins=nbins)
+
+    return pd.DataFrame({"start": edges[:-1], "end": edges[1:], "count": counts})
+
+
+def box_statistics(data: pd.DataFrame, x: str, y: str, group: str) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Computes the box plot statistics of `y` for every `group`/`x` combination in one groupby pass.
+
+    Returns a table with the quartiles and fences of every box (computed like plotly does: the fences are the most
+    extreme values within 1.5 IQR of the box) and a table with the outliers, the values outside the fences.
+    """
+
+    keys = list(dict.fromkeys([group, x]))
+    data = data[list(dict.fromkeys(keys + [y]))].dropna(subset=[y])
+
+    grouped = data.groupby(keys, sort=False, observed=True)
+    codes = grouped.ngroup().to_numpy()
+    quartiles = grouped[y].quantile([0.25, 0.5, 0.75])
+
+    # The quantiles are ordered per group (in order of appearance, like the group codes), then per quantile.
+    q1, median, q3 = quartiles.to_numpy(dtype=float).reshape(-1, 3).T
+    iqr = q3 - q1
+
+    values = data[y].to_numpy(dtype=float)
+    valid = codes >= 0
+    inside = valid & (values >= (q1 - 1.5 * iqr)[codes]) & (values <= (q3 + 1.5 * iqr)[codes])
+
+    fence_codes = pd.Series(codes[inside])
+    lower_fence = pd.Series(values[inside]).groupby(fence_codes).min()
+    upper_fence = pd.Series(values[inside]).groupby(fence_codes).max()
+
+    statistics = quartiles.index.droplevel(-1)[::3].to_frame(index=False)
+    statistics["q1"] = q1
+    statistics["median"] = median
+    statistics["q3"] = q3
+    statistics["lowerfence"] = lower_fence.reindex(range(len(statistics))).to_numpy()
+    statistics["upperfence"] = upper_fence.reindex(range(len(statistics))).to_numpy()
+    statistics["count"] = np.bincount(codes[valid], minlength=len(statistics))
+
+    outliers = data[valid & ~inside].reset_index(drop=True)
+
+    return statistics, outliers
+
+
+def pivot_grid(
+    data: pd.DataFrame,
+    index: str,
+    columns: str,
+    values: str,
+    aggfunc: str | None = None,
+    dtype: str = "float64",
+) -> pd.DataFrame:
+    """Pivots `values` to an `index` by `columns` grid of `dtype`, like `pivot_table` but with one coded groupby.
+
+    The keys are factorized (sorted, like `pivot` does) into a single cell code, so only the filled cells are grouped
+    and the grid is allocated once. Without `aggfunc` every cell must have at most one value, like `pivot`.
+    """
+
+    row_codes, row_labels = pd.factorize(data[index], sort=True)
+    column_codes, column_labels = pd.factorize(data[columns], sort=True)
+    valid = (row_codes >= 0) & (column_codes >= 0)
+    cells = row_codes[valid] * len(column_labels) + column_codes[valid]
+    cell_values = pd.Series(data[values].to_numpy()[valid])
+
+    if aggfunc is None:
+        if len(np.unique(cells)) != len(cells):
+            raise ValueError(f"'{index}' and '{columns}' contain duplicate entries, pass an `aggfunc` to combine them.")
+
+        aggregated = pd.Series(cell_values.to_numpy(), index=cells)
+    else:
+        aggregated = cell_values.groupby(cells, sort=False).agg(aggfunc)
+
+    grid = np.full(len(row_labels) * len(column_labels), np.nan, dtype=dtype)
+    grid[aggregated.index.to_numpy()] = aggregated.to_numpy(dtype=dtype)
+
+    return pd.DataFrame(
+        grid.reshape(len(row_labels), len(column_labels)),
+        index=pd.Index(row_labels, name=index),
+        columns=pd.Index(column_labels, name=columns),
+    )
+
+
+def downsample_grid(grid: pd.DataFrame, max_rows: int, max_columns: int) -> pd.DataFrame:
+    """Averages blocks of cells of `grid` so it is at most `max_rows` by `max_columns`, ignoring missing cells.
+
+    Every block is labeled with the label of its first row and column.
+    """
+
+    rows, columns = grid.shape
+    row_step = -(-rows // max_rows)
+    column_step = -(-columns // max_columns)
+
+    if row_step == 1 and column_step == 1:
+        return grid
+
+    # Pad the grid with missing cells to whole blocks, then average every block.
+    padded = np.full(
+        (-(-rows // row_step) * row_step, -(-columns // column_step) * column_step), np.nan, dtype=grid.to_numpy().dtype
+    )
+    padded[:rows, :columns] = grid.to_numpy()
+    blocks = padded.reshape(padded.shape[0] // row_step, row_step, padded.shape[1] // column_step, column_step)
+
+    with np.errstate(invalid="ignore"):
+        counts = (~np.isnan(blocks)).sum(axis=(1, 3))
+        sums = np.nansum(blocks, axis=(1, 3))
+        averages = np.where(counts > 0, sums / np.maximum(counts, 1), np.nan).astype(padded.dtype)
+
+    return pd.DataFrame(averages, index=grid.index[::row_step], columns=grid.columns[::column_step])
+
+
+# Downsampling algorithms supported by `downsample`.
+DOWNSAMPLING_METHODS = ("lttb", "minmax")
+
+
+def _as_float(values: pd.Series) -> np.ndarray:
+    """Returns `values` as floats, dates as nanoseconds and other (e.g. text) values as their position."""
+
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.to_numpy(dtype="datetime64[ns]").view("i8").astype(float)
+
+    if pd.api.types.is_numeric_dtype(values):
+        return values.to_numpy(dtype=float)
+
+    return np.arange(len(values), dtype=float)
+
+
+def _lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """Returns the positions of the points selected by Largest-Triangle-Three-Buckets."""
+
+    n = len(x)
+
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # Bucket boundaries, the first and last point are buckets of their own.
+    bounds = (np.arange(threshold - 1) * (n - 2) / (threshold - 2)).astype(int) + 1
+    bounds[-1] = n - 1
+
+    # Averages of every bucket, used as the third point of the triangle of the bucket before it.
+    sums_x = np.add.reduceat(x[1:-1], bounds[:-1] - 1)
+    sums_y = np.add.reduceat(y[1:-1], bounds[:-1] - 1)
+    sizes = np.diff(bounds)
+    average_x = np.append(sums_x / sizes, x[-1])
+    average_y = np.append(sums_y / sizes, y[-1])
+
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+
+    for i in range(threshold - 2):
+        start, end = bounds[i], bounds[i + 1]
+        area = np.abs(
+            (x[a] - average_x[i + 1]) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (average_y[i + 1] - y[a])
+        )
+        a = start + int(np.argmax(np.nan_to_num(area, nan=-1.0)))
+        selected[i + 1] = a
+
+    return selected
+
+
+def _minmax(y: np.ndarray, starts: np.ndarray, sizes: np.ndarray, max_points: int) -> np.ndarray:
+    """Returns the positions of the first, last, minimum and maximum point of every bucket, for all groups at once."""
+
+    group = np.repeat(np.arange(len(sizes)), sizes)
+    position = np.arange(len(y)) - starts[group]
+    large = sizes[group] > max_points
+
+    buckets_per_group = max(1, (max_points - 2) // 2)
+    bucket = group * buckets_per_group + position * buckets_per_group // sizes[group]
+
+    rows = np.flatnonzero(large)
+    low = pd.Series(np.where(np.isnan(y[rows]), np.inf, y[rows]), index=rows).groupby(bucket[rows]).idxmin()
+    high = pd.Series(np.where(np.isnan(y[rows]), -np.inf, y[rows]), index=rows).groupby(bucket[rows]).idxmax()
+    edges = np.concatenate([starts, starts + sizes - 1])
+
+    return np.unique(np.concatenate([np.flatnonzero(~large), low.to_numpy(), high.to_numpy(), edges]))
+
+
+def downsample(
+    data: pd.DataFrame,
+    x: str,
+    y: str,
+    max_points: int,
+    group: str | None = None,
+    method: str = "lttb",
+) -> pd.DataFrame:
+    """Reduces every `group` of `data` to about `max_points` rows, keeping the shape of the `y` over `x` series.
+
+    "lttb" selects the points with Largest-Triangle-Three-Buckets, "minmax" keeps the minimum and maximum of every
+    bucket. Points are selected in `x` order, the selected rows are returned in their original order.
+    """
+
+    if method not in DOWNSAMPLING_METHODS:
+        raise ValueError(f"Unknown downsampling method '{method}', expected one of {DOWNSAMPLING_METHODS}.")
+
+    x_values = _as_float(data[x])
+    y_values = data[y].to_numpy(dtype=float)
+    codes = data.groupby(group, sort=False).ngroup().to_numpy() if group is not None else np.zeros(len(data), dtype=int)
+
+    # Sort by group, then by x, so every group is a contiguous, x ordered slice.
+    order = np.lexsort((x_values, codes))
+    x_values, y_values, codes = x_values[order], y_values[order], codes[order]
+
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]]) if len(codes) else np.array([], dtype=int)
+    sizes = np.diff(np.r_[starts, len(codes)])
+
+    if method == "minmax":
+        keep = _minmax(y_values, starts, sizes, max_points)
+    else:
+        keep = np.concatenate([
+            start + _lttb(x_values[start:start + size], y_values[start:start + size], max_points)
+            for start, size in zip(starts, sizes)
+        ] or [np.array([], dtype=int)])
+
+    return data.iloc[np.sort(order[keep])]
@@ -0,0 +1,53 @@
+from concurrent.futures import Executor
+from typing import Any, Iterable
+import asyncio
+import functools
+import traceback
+
+from dt_modules.batch import ExportJob, ExportResult, run_job
+
+
+async def save_json_async(chart, location: str, executor: Executor | None = None, **save_kwargs):
+    """Runs `chart.save_json(location, **save_kwargs)` on the `executor`, so the event loop is not blocked.
+
+    Building the figure, encoding and writing the file all happen in the executor, with the same code as `save_json`.
+    Without an `executor` the loop's default thread pool is used; a `ProcessPoolExecutor` also keeps the CPU bound
+    work from holding the GIL, the chart is then sent to (and its figure built in) the worker process.
+    """
+
+    loop = asyncio.get_running_loop()
+    await loop.run_in_executor(executor, functools.partial(chart.save_json, location, **save_kwargs))
+
+
+def _save(chart, location: str, save_kwargs: dict) -> ExportResult:
+    save_kwargs = dict(save_kwargs)
+    job = ExportJob(type(chart), None, json_path=location, save_kwargs=save_kwargs, cache=save_kwargs.pop("cache", None))
+
+    return run_job(job, chart)
+
+
+async def export_many_async(
+    charts: dict[str, Any] | Iterable[tuple[str, Any]],
+    executor: Executor | None = None,
+    concurrency: int = 4,
+    **save_kwargs,
+) -> list[ExportResult]:
+    """Saves many charts on the `executor`, at most `concurrency` at a time, and returns their results in order.
+
+    `charts` maps the output location to a chart, `save_kwargs` are passed to every `save_json`.
+    A failing chart does not stop the others, check `ExportResult.ok`.
+    """
+
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    items = list(charts.items() if isinstance(charts, dict) else charts)
+
+    async def save(location: str, chart) -> ExportResult:
+        async with semaphore:
+            try:
+                return await loop.run_in_executor(executor, _save, chart, location, save_kwargs)
+            except Exception:
+                # The chart could not be sent to, or crashed, its worker process.
+                return ExportResult(location, error=traceback.format_exc())
+
+    return list(await asyncio.gather(*(save(location, chart) for location, chart in items)))
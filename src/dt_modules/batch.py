@@ -0,0 +1,171 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable
+import time
+import traceback
+
+
+@dataclass
+class ExportJob:
+    """Describes one chart to build and export, so it can be run in a worker process.
+
+    `data` is a dataframe, a path to a csv/xlsx/parquet/json file or a (picklable) function returning a dataframe.
+    `kwargs` are passed to the `chart` class, `save_kwargs` to `save_json`.
+    The `excel_path` extension selects the data format: .xlsx, or the faster .csv and .parquet.
+    With a `cache` (`dt_modules.ExportCache`) unchanged charts are copied from the cache instead of exported again.
+    """
+
+    chart: type
+    data: Any
+    kwargs: dict = field(default_factory=dict)
+    json_path: str | None = None
+    excel_path: str | None = None
+    save_kwargs: dict = field(default_factory=dict)
+    name: str | None = None
+    cache: Any = None
+
+    @classmethod
+    def from_spec(cls, spec, **options) -> "ExportJob":
+        """Returns a job for the chart described by a `dt_modules.ChartSpec`, `options` are the other job fields."""
+
+        import dt_modules
+
+        arguments = spec.arguments()
+        data = arguments.pop(next(iter(arguments)))
+
+        return cls(getattr(dt_modules, spec.chart_class), data, arguments, **options)
+
+    def label(self) -> str:
+        """Returns a name for the job, used in results."""
+
+        return self.name or self.json_path or self.excel_path or self.chart.__name__
+
+
+@dataclass
+class ExportResult:
+    """Outcome of an `ExportJob`, with the duration (in seconds) of every phase."""
+
+    name: str
+    timings: dict[str, float] = field(default_factory=dict)
+    error: str | None = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def load_data(source: Any):
+    """Returns the dataframe for the data `source` of an `ExportJob`."""
+
+    if callable(source):
+        return source()
+
+    if isinstance(source, (str, Path)):
+        import pandas as pd
+
+        readers: dict[str, Callable] = {
+            ".csv": pd.read_csv,
+            ".xlsx": pd.read_excel,
+            ".parquet": pd.read_parquet,
+            ".json": pd.read_json,
+        }
+        suffix = Path(source).suffix.lower()
+
+        if suffix not in readers:
+            raise ValueError(f"Unsupported data source '{source}', expected one of {list(readers)}.")
+
+        return readers[suffix](source)
+
+    return source
+
+
+def run_job(job: ExportJob, chart=None) -> ExportResult:
+    """Builds and exports the chart of a single `job`, or only exports an already built `chart`.
+
+    Errors are reported in the result instead of raised.
+    """
+
+    result = ExportResult(job.label())
+    start = time.perf_counter()
+    phase_start = start
+
+    def finish(phase: str):
+        nonlocal phase_start
+        now = time.perf_counter()
+        result.timings[phase] = now - phase_start
+        phase_start = now
+
+    try:
+        if chart is None:
+            data = load_data(job.data)
+            finish("load")
+
+            chart = job.chart(data, **job.kwargs)
+            finish("construct")
+
+        if job.json_path is not None:
+            chart.save_json(job.json_path, cache=job.cache, **job.save_kwargs)
+            finish("save_json")
+
+        if job.excel_path is not None:
+            from dt_modules.excel import infer_format
+
+            data_format = infer_format(job.excel_path)
+            key = job.cache.key(chart, format=data_format) if job.cache is not None else None
+
+            if key is None or not job.cache.fetch(key, job.excel_path):
+                chart.save_excel(job.excel_path, data_format)
+
+                if key is not None:
+                    job.cache.store(key, job.excel_path)
+
+            finish("save_excel")
+    except Exception:
+        result.error = traceback.format_exc()
+
+    result.timings["total"] = time.perf_counter() - start
+    return result
+
+
+def run_pool(
+    function: Callable[..., ExportResult],
+    tasks: list[tuple],
+    names: list[str],
+    workers: int | None = None,
+    initializer: Callable[[], Any] | None = None,
+) -> list[ExportResult]:
+    """Runs `function(*task)` for every task on a pool of `workers` processes and returns the results in order.
+
+    Every worker process runs `initializer` once before its first task. A task which can not be sent to, or crashes,
+    its worker process gets a failed `ExportResult` with its name from `names`. With `workers=1` the tasks run in this
+    process.
+    """
+
+    if workers == 1:
+        return [function(*task) for task in tasks]
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    results: list[ExportResult | None] = [None] * len(tasks)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=initializer) as executor:
+        futures = {executor.submit(function, *task): i for i, task in enumerate(tasks)}
+
+        for future in as_completed(futures):
+            i = futures[future]
+
+            try:
+                results[i] = future.result()
+            except Exception:
+                results[i] = ExportResult(names[i], error=traceback.format_exc())
+
+    return results
+
+
+def export_batch(jobs: list[ExportJob], workers: int | None = None) -> list[ExportResult]:
+    """Runs the export `jobs` on a pool of `workers` processes (defaults to the cpu count) and returns their results in order.
+
+    A failing job does not stop the batch, check `ExportResult.ok`. With `workers=1` the jobs run in this process.
+    """
+
+    return run_pool(run_job, [(job,) for job in jobs], [job.label() for job in jobs], workers)
@@ -0,0 +1,153 @@
+from pathlib import Path
+from typing import Any
+import hashlib
+import importlib.metadata
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+
+def _version(package: str) -> str:
+    try:
+        return importlib.metadata.version(package)
+    except importlib.metadata.PackageNotFoundError:
+        return "unknown"
+
+
+class ExportCache:
+    """On-disk cache of export files, keyed by a hash of the chart contents.
+
+    The key covers the chart class, all chart attributes (dataframes are hashed with `pandas.util.hash_pandas_object`,
+    arrays by their bytes), the export options and the dt-modules and plotly versions. Entries are evicted least
+    recently used first when the cache holds more than `max_entries` files or `max_bytes` bytes.
+    """
+
+    def __init__(self, directory: str | Path, max_entries: int | None = 1000, max_bytes: int | None = None):
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _hash_value(self, value: Any, digest) -> Any:
+        """Adds the arrays in `value` to the `digest`, returns the json representation of the rest of `value`."""
+
+        import numpy as np
+        import pandas as pd
+
+        if value is None or isinstance(value, (str, int, float)):
+            return value
+
+        if isinstance(value, dict):
+            # As pairs, json objects only have string keys.
+            return [[self._hash_value(key, digest), self._hash_value(item, digest)] for key, item in value.items()]
+
+        if isinstance(value, (list, tuple)):
+            return [self._hash_value(item, digest) for item in value]
+
+        if isinstance(value, (pd.Index, pd.Categorical)):
+            value = pd.Series(value)
+
+        if isinstance(value, pd.Series):
+            value = value.to_frame()
+
+        if isinstance(value, pd.DataFrame):
+            digest.update(repr((list(value.columns), [str(dtype) for dtype in value.dtypes])).encode())
+
+            try:
+                digest.update(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+            except TypeError:
+                # Unhashable cells, e.g. lists.
+                digest.update(pickle.dumps(value))
+
+            return "<dataframe>"
+
+        if isinstance(value, np.ndarray):
+            # Not by repr, numpy leaves out the middle of large arrays.
+            digest.update(repr((value.dtype.str, value.shape)).encode())
+            digest.update(pickle.dumps(value) if value.dtype.hasobject else np.ascontiguousarray(value).tobytes())
+
+            return "<array>"
+
+        return repr(value)
+
+    def key(self, chart, **options) -> str:
+        """Returns the cache key of the export of `chart` with the given export `options`."""
+
+        digest = hashlib.sha256()
+        chart_type = type(chart)
+        state = {name: value for name, value in vars(chart).items() if name != "_figure"}
+
+        header = json.dumps(
+            {
+                "chart": f"{chart_type.__module__}.{chart_type.__qualname__}",
+                "versions": [_version("dt-modules"), _version("plotly")],
+                "options": self._hash_value(options, digest),
+                "state": self._hash_value(state, digest),
+            }
+        )
+        digest.update(header.encode())
+
+        return digest.hexdigest()
+
+    def _entry(self, key: str) -> Path:
+        return self.directory / f"{key}.export"
+
+    def fetch(self, key: str, location: str | Path) -> bool:
+        """Copies the cached export for `key` to `location`, returns `False` when it is not cached."""
+
+        entry = self._entry(key)
+
+        try:
+            shutil.copyfile(entry, location)
+        except FileNotFoundError:
+            return False
+
+        # Mark the entry as recently used.
+        os.utime(entry)
+        return True
+
+    def store(self, key: str, location: str | Path):
+        """Adds the export at `location` to the cache under `key`."""
+
+        # Write to a temporary file first, so other processes never see a partial entry.
+        fd, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+
+        try:
+            shutil.copyfile(location, temporary)
+            os.replace(temporary, self._entry(key))
+        except BaseException:
+            os.unlink(temporary)
+            raise
+
+        self.evict()
+
+    def evict(self):
+        """Removes the least recently used entries until the cache is within its limits."""
+
+        entries = []
+        for entry in self.directory.glob("*.export"):
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry))
+
+        entries.sort(reverse=True)
+        total = 0
+
+        for i, (_, size, entry) in enumerate(entries):
+            total += size
+            over_entries = self.max_entries is not None and i >= self.max_entries
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+
+            if over_entries or over_bytes:
+                entry.unlink(missing_ok=True)
+
+    def clear(self):
+        """Removes all entries."""
+
+        for entry in self.directory.glob("*.export"):
+            entry.unlink(missing_ok=True)
@@ -1,3 +1,5 @@
+from typing import Iterable, Iterator
+
 # Colors from: https://www.rijkshuisstijl.nl/publiek/modules/product/DigitalStyleGuide/default/index.aspx?ItemId=6744
 government_theme = {
     "Lintblauw": {
@@ -167,3 +169,61 @@ quantitative_colors = [
     "Violet",
     "Groen",
 ]
+
+
+# Intensities a theme color is used with, before the sequence starts again at full intensity.
+intensities = (100, 75, 60, 45, 30, 15)
+
+
+class Palette:
+    """An immutable, repeating sequence of colors. Use `take` to get a sequence of any length."""
+
+    __slots__ = ("colors",)
+
+    def __init__(self, colors: Iterable[str]):
+        self.colors = tuple(colors)
+
+        if not self.colors:
+            raise ValueError("A palette needs at least one color.")
+
+    @classmethod
+    def from_theme(
+        cls,
+        theme: dict[str, dict[int, str]],
+        color_names: Iterable[str],
+        shades: Iterable[int] = intensities,
+    ) -> "Palette":
+        """Cycles through `color_names`, every round uses the next intensity from `shades` (and wraps around)."""
+
+        color_names = tuple(color_names)
+        return cls(theme[name][shade] for shade in shades for name in color_names)
+
+    def take(self, length: int) -> tuple[str, ...]:
+        """Returns the first `length` colors of the (repeating) palette."""
+
+        if length <= len(self.colors):
+            # Taking the whole palette returns `colors` itself, which all charts share.
+            return self.colors[:length]
+
+        # Longer sequences (e.g. a color per table row) are built per call, so they are not kept alive.
+        repeats, remainder = divmod(length, len(self.colors))
+        return self.colors * repeats + self.colors[:remainder]
+
+    def __len__(self) -> int:
+        return len(self.colors)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.colors)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Palette) and self.colors == other.colors
+
+    def __hash__(self) -> int:
+        return hash(self.colors)
+
+    def __repr__(self) -> str:
+        return f"Palette({list(self.colors)!r})"
+
+
+# Palette used by the charts when no colors are given.
+default_palette = Palette.from_theme(government_theme, quantitative_colors)
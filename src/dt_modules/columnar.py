@@ -0,0 +1,264 @@
+from typing import Any, Callable
+import base64
+import functools
+import sys
+
+import numpy as np
+import pandas as pd
+
+
+# Typed array codes understood by plotly.js, see `plotly.io._utils.convert_to_base64`.
+_TYPED_ARRAY_CODES = ("f8", "f4", "i1", "i2", "i4", "u1", "u2", "u4")
+
+# Trace attributes which may hold a copy of a dataframe column.
+TRACE_ARRAY_KEYS = ("x", "y", "z", "values", "labels", "parents", "ids", "text")
+
+
+def _typed_array_dtype(values: np.ndarray) -> np.dtype | None:
+    """Returns the dtype `values` can be stored as in a typed array buffer, `None` when it can't."""
+
+    dtype = values.dtype
+
+    if dtype.kind not in "iuf":
+        return None
+
+    if dtype.itemsize == 8 and dtype.kind in "iu":
+        # plotly.js has no 64 bit integer arrays, only store them when they fit in 32 bits.
+        target = np.dtype("i4" if dtype.kind == "i" else "u4")
+        info = np.iinfo(target)
+
+        if len(values) and (values.min() < info.min or values.max() > info.max):
+            return None
+
+        return target
+
+    dtype = dtype.newbyteorder("=")
+    return dtype if f"{dtype.kind}{dtype.itemsize}" in _TYPED_ARRAY_CODES else None
+
+
+def encode_array(values: Any, binary: bool = True) -> list | dict:
+    """Encodes a column as a (base64) typed array when `binary` is set and the column is numeric, otherwise as a list."""
+
+    values = np.asarray(values)
+
+    if values.dtype.kind == "M":
+        # `tolist` gives integer nanoseconds for datetime64[ns], store ISO dates instead.
+        return np.datetime_as_string(values).tolist()
+
+    if values.dtype.kind == "m":
+        return values.view("i8").tolist()
+
+    dtype = _typed_array_dtype(values) if binary else None
+
+    if dtype is None:
+        return values.tolist()
+
+    buffer = np.ascontiguousarray(values, dtype=dtype.newbyteorder("<"))
+    return {
+        "dtype": f"{dtype.kind}{dtype.itemsize}",
+        "bdata": base64.b64encode(buffer.data).decode("ascii"),
+    }
+
+
+def decode_array(payload: list | dict) -> np.ndarray | list:
+    """Decodes a column written by `encode_array`, or a typed array of a plotly figure."""
+
+    if isinstance(payload, dict) and "bdata" in payload:
+        dtype = np.dtype(payload["dtype"]).newbyteorder("<")
+        values = np.frombuffer(base64.b64decode(payload["bdata"]), dtype=dtype)
+
+        if "shape" in payload:
+            # Plotly's typed arrays of matrices, e.g. a heatmap's `z`.
+            values = values.reshape([int(size) for size in str(payload["shape"]).split(",")])
+
+        return values if sys.byteorder == "little" else values.astype(dtype.newbyteorder("="))
+
+    return payload
+
+
+def encode_dataframe(data: pd.DataFrame, binary: bool = True, encode: Callable[[np.ndarray], Any] | None = None) -> dict:
+    """Encodes `data` like `DataFrame.to_dict(orient="split")`, but with one (typed) array per column.
+
+    `encode` replaces `encode_array` to store the arrays elsewhere, e.g. in a sidecar file.
+    """
+
+    if encode is None:
+        encode = functools.partial(encode_array, binary=binary)
+
+    index = data.index
+
+    if isinstance(index, pd.RangeIndex):
+        encoded_index = {"start": index.start, "stop": index.stop, "step": index.step}
+    else:
+        encoded_index = encode(index.to_numpy())
+
+    return {
+        "index": encoded_index,
+        "columns": list(data.columns),
+        "dtypes": [str(dtype) for dtype in data.dtypes],
+        "data": [encode(data[column].to_numpy()) for column in data.columns],
+    }
+
+
+def _is_restorable_dtype(name: str) -> bool:
+    """Returns whether a column of the dtype `name` can be restored from its encoded values with `astype`."""
+
+    try:
+        return pd.api.types.pandas_dtype(name).kind in "iufbMm"
+    except TypeError:
+        return False
+
+
+def decode_dataframe(payload: dict, decode: Callable[[Any], Any] = decode_array, copy: bool = True) -> pd.DataFrame:
+    """Rebuilds the dataframe written by `encode_dataframe`, `decode` reads the arrays stored by its `encode`.
+
+    Without `copy` the dataframe uses the decoded arrays as they are, e.g. memory-mapped ones.
+    """
+
+    index = payload["index"]
+
+    if isinstance(index, dict) and "start" in index:
+        index = pd.RangeIndex(index["start"], index["stop"], index["step"])
+    else:
+        index = pd.Index(decode(index))
+
+    data = pd.DataFrame(
+        {column: decode(values) for column, values in zip(payload["columns"], payload["data"])},
+        index=index,
+        columns=payload["columns"],
+        copy=copy,
+    )
+
+    # Typed arrays may be stored with a smaller integer type and dates as strings, restore the original types.
+    dtypes = {
+        column: dtype
+        for column, dtype in zip(payload["columns"], payload.get("dtypes", []))
+        if _is_restorable_dtype(dtype) and str(data[column].dtype) != dtype
+    }
+
+    return data.astype(dtypes) if dtypes else data
+
+
+def _trace_values(values: Any) -> np.ndarray | None:
+    """Returns the array held by a trace attribute, `None` for scalars and nested arrays."""
+
+    if isinstance(values, dict):
+        if "bdata" not in values or "shape" in values:
+            return None
+        return np.asarray(decode_array(values))
+
+    if isinstance(values, (list, tuple, np.ndarray, pd.Series, pd.Index)):
+        values = np.asarray(values)
+        return values if values.ndim == 1 else None
+
+    return None
+
+
+def _same_values(left: np.ndarray, right: np.ndarray) -> bool:
+    if len(left) != len(right):
+        return False
+
+    if left.dtype.kind in "iufb" and right.dtype.kind in "iufb":
+        return bool(np.array_equal(left, right, equal_nan=left.dtype.kind == "f" or right.dtype.kind == "f"))
+
+    if left.dtype.kind in "iufb" or right.dtype.kind in "iufb":
+        return False
+
+    return bool(np.array_equal(left.astype(object), right.astype(object)))
+
+
+def _column_reference(values: np.ndarray, columns: dict[Any, np.ndarray], rows, where) -> dict | None:
+    """Returns a reference to the dataframe column equal to `values` on the given `rows`."""
+
+    for column, column_values in columns.items():
+        selected = column_values if rows is None else column_values[rows]
+
+        if _same_values(values, selected):
+            reference = {"$column": column}
+            if where is not None:
+                reference["$where"] = where
+
+            return reference
+
+    return None
+
+
+def reference_columns(figure: dict, data: pd.DataFrame, group_column: str | None = None) -> dict:
+    """Replaces trace arrays in `figure` that repeat a column of `data` with a reference to that column.
+
+    Traces drawn per `group_column` value refer to the rows of their group (plotly express' `legendgroup`).
+    """
+
+    columns = {column: data[column].to_numpy() for column in data.columns}
+    groups = {}
+
+    if group_column is not None and group_column in data.columns:
+        groups = pd.Series(np.arange(len(data))).groupby(data[group_column].astype(str).to_numpy()).indices
+
+    for trace in figure.get("data", []):
+        group = trace.get("legendgroup")
+        candidates = [(None, None)]
+
+        if group in groups:
+            candidates.insert(0, (groups[group], {"column": group_column, "equals": group}))
+
+        for key in TRACE_ARRAY_KEYS:
+            values = _trace_values(trace.get(key))
+
+            if values is None:
+                continue
+
+            for rows, where in candidates:
+                reference = _column_reference(values, columns, rows, where)
+
+                if reference is not None:
+                    trace[key] = reference
+                    break
+
+    return figure
+
+
+def resolve_columns(figure: dict, data: pd.DataFrame) -> dict:
+    """Replaces the column references written by `reference_columns` with the referenced values."""
+
+    for trace in figure.get("data", []):
+        for key, value in trace.items():
+            if not isinstance(value, dict) or "$column" not in value:
+                continue
+
+            values = data[value["$column"]]
+            where = value.get("$where")
+
+            if where is not None:
+                values = values[data[where["column"]].astype(str) == where["equals"]]
+
+            trace[key] = values.to_numpy()
+
+    return figure
+
+
+def to_columnar(contents: dict, figure: dict, binary: bool = True) -> tuple[dict, dict]:
+    """Converts export `contents` and the `figure` dict to the columnar data format."""
+
+    data = contents.get("dataframe")
+
+    if not isinstance(data, pd.DataFrame):
+        return contents, figure
+
+    contents = dict(contents)
+    contents["dataframe"] = encode_dataframe(data, binary)
+    contents["dataFormat"] = "columnar"
+    figure = reference_columns(figure, data, contents.get("columnToColor"))
+
+    return contents, figure
+
+
+def from_columnar(contents: dict, figure: dict) -> tuple[dict, dict]:
+    """Converts export `contents` and the `figure` dict written by `to_columnar` back to a dataframe and plain arrays."""
+
+    contents = dict(contents)
+    data = decode_dataframe(contents["dataframe"])
+    contents["dataframe"] = data
+    del contents["dataFormat"]
+
+    return contents, resolve_columns(figure, data)
@@ -0,0 +1,127 @@
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+import importlib.util
+import os
+import time
+import tracemalloc
+
+
+# Formats `save_workbook` can write, csv and parquet are the faster fallbacks for large data.
+EXCEL_FORMATS = ("xlsx", "csv", "parquet")
+
+
+@dataclass
+class ExcelReport:
+    """Describes a finished data export, so the format of a job can be chosen on measurements."""
+
+    locations: list[str]
+    format: str
+    rows: int
+    seconds: float
+    size: int
+    peak_bytes: int | None = None
+
+
+def infer_format(location: str | Path, format: str | None = None) -> str:
+    """Returns the export format, taken from the extension of `location` when `format` is not given."""
+
+    if format is None:
+        format = Path(location).suffix.lstrip(".").lower() or "xlsx"
+
+    if format not in EXCEL_FORMATS:
+        raise ValueError(f"Unknown data export format '{format}', expected one of {EXCEL_FORMATS}.")
+
+    return format
+
+
+def _cell_columns(data) -> list:
+    """Returns the columns of `data` as lists of cell values, with missing values as empty cells."""
+
+    columns = []
+    for column in [data.index.to_series()] + [data[name] for name in data.columns]:
+        if column.hasnans:
+            column = column.astype(object).where(column.notna(), None)
+
+        columns.append(column.tolist())
+
+    return columns
+
+
+def _write_xlsx(sheets: dict[str, Any], location: str):
+    """Writes every dataframe to its own sheet, streaming the rows with a write-only openpyxl workbook."""
+
+    from openpyxl import Workbook
+
+    workbook = Workbook(write_only=True)
+
+    for name, data in sheets.items():
+        sheet = workbook.create_sheet(title=name[:31])
+        sheet.append([data.index.name] + [str(column) for column in data.columns])
+
+        for row in zip(*_cell_columns(data)):
+            sheet.append(row)
+
+    workbook.save(location)
+
+
+def _sheet_location(location: str, name: str, sheets: dict) -> str:
+    """Returns the file for a sheet, csv and parquet use one file per sheet when there are several."""
+
+    if len(sheets) == 1:
+        return location
+
+    path = Path(location)
+    return str(path.with_name(f"{path.stem}.{name}{path.suffix}"))
+
+
+def save_workbook(
+    sheets: dict[str, Any],
+    location: str,
+    format: str | None = None,
+    trace_memory: bool = False,
+) -> ExcelReport:
+    """Saves the data of several charts (or dataframes), one sheet per chart, and reports the time it took.
+
+    The format follows from the extension of `location` unless `format` is given: "xlsx" (streamed with a write-only
+    workbook), or the much faster "csv" and "parquet", which write a file per sheet when there are several.
+    With `trace_memory` the peak memory use is measured with tracemalloc, which slows the export down.
+    """
+
+    format = infer_format(location, format)
+    sheets = {name: data.get_data() if hasattr(data, "get_data") else data for name, data in sheets.items()}
+
+    if format == "parquet" and importlib.util.find_spec("pyarrow") is None:
+        raise ImportError("The parquet format requires the pyarrow package, install `dt-modules[parquet]`.")
+    locations = [_sheet_location(location, name, sheets) for name in sheets]
+
+    if trace_memory:
+        tracemalloc.start()
+
+    start = time.perf_counter()
+
+    try:
+        if format == "xlsx":
+            locations = [location]
+            _write_xlsx(sheets, location)
+        elif format == "csv":
+            for target, data in zip(locations, sheets.values()):
+                data.to_csv(target)
+        else:
+            for target, data in zip(locations, sheets.values()):
+                data.to_parquet(target)
+
+        seconds = time.perf_counter() - start
+        peak_bytes = tracemalloc.get_traced_memory()[1] if trace_memory else None
+    finally:
+        if trace_memory:
+            tracemalloc.stop()
+
+    return ExcelReport(
+        locations=locations,
+        format=format,
+        rows=sum(data.shape[0] for data in sheets.values()),
+        seconds=seconds,
+        size=sum(os.path.getsize(target) for target in locations),
+        peak_bytes=peak_bytes,
+    )
@@ -0,0 +1,260 @@
+from pathlib import Path
+from typing import Any, BinaryIO
+import importlib.util
+import json
+
+from dt_modules.profiling import Phase
+
+
+# Engines used to encode export files, mirrors plotly's `plotly.io.json.config` engines.
+JSON_ENGINES = ("json", "orjson", "auto")
+
+# The "json" engine writes exports byte for byte identical to the original `json.dump` output.
+default_engine = "json"
+
+# How the `dataframe` parameter is stored: "dict" is `DataFrame.to_dict()`, "columnar" stores one array per column,
+# "sidecar" stores the numeric arrays in a binary file next to the export.
+DATA_FORMATS = ("dict", "columnar", "sidecar")
+
+
+# Compressions of export files, picked from the extension (.json.gz, .json.zst) when not given.
+COMPRESSIONS = ("gzip", "zstd")
+
+_COMPRESSION_SUFFIXES = {".gz": "gzip", ".zst": "zstd"}
+
+# The first bytes of gzip and zstd streams, so compressed exports are read whatever their name.
+_COMPRESSION_MAGIC = {b"\x1f\x8b": "gzip", b"\x28\xb5\x2f\xfd": "zstd"}
+
+
+def resolve_compression(location: str | Path, compression: str | None = None) -> str | None:
+    """Returns the compression of the export at `location`, taken from its extension when `compression` is not given."""
+
+    if compression is None:
+        return _COMPRESSION_SUFFIXES.get(Path(location).suffix.lower())
+
+    if compression not in COMPRESSIONS:
+        raise ValueError(f"Unknown compression '{compression}', expected one of {COMPRESSIONS}.")
+
+    return compression
+
+
+def page_location(location: str | Path, page: int) -> Path:
+    """Returns the file of rows `page` of a paginated export, `table.export.json.gz` has `table.export.page-0.json.gz`."""
+
+    path = Path(location)
+    compression_suffix = path.suffix if path.suffix.lower() in _COMPRESSION_SUFFIXES else ""
+
+    if compression_suffix:
+        path = path.with_suffix("")
+
+    return path.with_name(f"{path.stem}.page-{page}{path.suffix}{compression_suffix}")
+
+
+def open_export(location: str | Path, mode: str = "rb", compression: str | None = None, level: int | None = None) -> BinaryIO:
+    """Opens an export file for binary reading ("rb") or writing ("wb"), (de)compressing while streaming.
+
+    Written files are compressed by the extension of `location` unless `compression` is given, read files by their
+    contents. The `level` defaults to 6 for gzip and 3 for zstd, which requires the zstandard package.
+    """
+
+    if mode == "rb":
+        with open(location, "rb") as f:
+            magic = f.read(4)
+
+        compression = next((name for prefix, name in _COMPRESSION_MAGIC.items() if magic.startswith(prefix)), None)
+    else:
+        compression = resolve_compression(location, compression)
+
+    if compression == "gzip":
+        import gzip
+
+        return gzip.open(location, mode, compresslevel=6 if level is None else level)
+
+    if compression == "zstd":
+        if importlib.util.find_spec("zstandard") is None:
+            raise ImportError("The zstd compression requires the zstandard package, install `dt-modules[zstd]`.")
+
+        import zstandard
+
+        file = open(location, mode)
+
+        if mode == "rb":
+            return zstandard.ZstdDecompressor().stream_reader(file, closefd=True)
+
+        return zstandard.ZstdCompressor(level=3 if level is None else level).stream_writer(file, closefd=True)
+
+    return open(location, mode)
+
+
+def resolve_engine(engine: str | None = None) -> str:
+    """Returns the concrete JSON engine ("json" or "orjson") to use for the given `engine` name."""
+
+    if engine is None:
+        engine = default_engine
+
+    if engine not in JSON_ENGINES:
+        raise ValueError(f"Unknown JSON engine '{engine}', expected one of {JSON_ENGINES}.")
+
+    if engine == "auto":
+        return "orjson" if importlib.util.find_spec("orjson") is not None else "json"
+
+    if engine == "orjson" and importlib.util.find_spec("orjson") is None:
+        raise ImportError("The orjson engine requires the orjson package, install `dt-modules[orjson]`.")
+
+    return engine
+
+
+def _encode_default(value: Any):
+    """Converts values the JSON encoders do not know about (e.g. dataframes) to plain python objects."""
+
+    if hasattr(value, "to_dict"):
+        return value.to_dict()
+
+    if hasattr(value, "tolist"):
+        return value.tolist()
+
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def figure_to_dict(figure) -> dict:
+    """Returns the plotly `figure` as a dictionary without trace uids, like `figure.to_json()` does."""
+
+    figure_dict = figure.to_dict()
+
+    for trace in figure_dict.get("data", []):
+        trace.pop("uid", None)
+
+    return figure_dict
+
+
+def encode_figure(figure, engine: str | None = None) -> bytes:
+    """Serializes the plotly `figure` (or its dictionary) once, using the given JSON `engine`."""
+
+    engine = resolve_engine(engine)
+    figure_dict = figure if isinstance(figure, dict) else figure_to_dict(figure)
+
+    if engine == "orjson":
+        from plotly.io.json import to_json_plotly
+
+        return to_json_plotly(figure_dict, engine="orjson").encode()
+
+    from _plotly_utils.utils import PlotlyJSONEncoder
+
+    return json.dumps(figure_dict, cls=PlotlyJSONEncoder).encode()
+
+
+def encode_value(value: Any, engine: str | None = None) -> bytes:
+    """Serializes a plain value (e.g. the `parameters` block), using the given JSON `engine`."""
+
+    engine = resolve_engine(engine)
+
+    if engine == "orjson":
+        import orjson
+
+        options = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        return orjson.dumps(value, default=_encode_default, option=options)
+
+    return json.dumps(value, default=_encode_default).encode()
+
+
+def write_export(
+    file: BinaryIO, key: str, contents: dict, figure, engine: str | None = None
+):
+    """Streams an export (`contents` under `key`, followed by the figure) to the binary `file`."""
+
+    engine = resolve_engine(engine)
+    separator = b"," if engine == "orjson" else b", "
+    colon = b":" if engine == "orjson" else b": "
+
+    with Phase("encode_parameters"):
+        file.write(b"{" + encode_value(key, engine) + colon)
+        file.write(encode_value(contents, engine))
+
+    with Phase("to_dict"):
+        figure_dict = figure if isinstance(figure, dict) else figure_to_dict(figure)
+
+    with Phase("encode_figure"):
+        file.write(separator + b'"figureContents"' + colon)
+        file.write(encode_figure(figure_dict, engine))
+        file.write(b"}")
+
+
+def save_export(
+    location: str,
+    key: str,
+    contents: dict,
+    figure,
+    engine: str | None = None,
+    data_format: str = "dict",
+    binary: bool = True,
+    compression: str | None = None,
+    level: int | None = None,
+):
+    """Writes an export file to `location`, which can be uploaded to the data portal.
+
+    With the "columnar" `data_format` the dataframe is stored per column (as base64 typed arrays when `binary` is set)
+    and trace arrays which repeat a dataframe column refer to that column instead. The "sidecar" format does the same,
+    but writes every numeric array as raw little-endian bytes to a `.bin` file next to `location`, see
+    `dt_modules.sidecar`.
+    The export is compressed while it is written with the `compression` ("gzip" or "zstd", by default taken from the
+    `.gz`/`.zst` extension of `location`) at the given `level`, see `open_export`.
+    """
+
+    if data_format not in DATA_FORMATS:
+        raise ValueError(f"Unknown data format '{data_format}', expected one of {DATA_FORMATS}.")
+
+    if data_format == "columnar":
+        from dt_modules.columnar import to_columnar
+
+        with Phase("to_columnar"):
+            contents, figure = to_columnar(contents, figure_to_dict(figure), binary)
+
+    if data_format == "sidecar":
+        from dt_modules.sidecar import sidecar_location, to_sidecar
+
+        data_location = sidecar_location(location)
+
+        with Phase("write_sidecar", location=data_location), open(data_location, "wb") as data_file:
+            contents, figure = to_sidecar(contents, figure_to_dict(figure), data_file, data_location.name)
+
+    with open_export(location, "wb", compression, level) as f:
+        write_export(f, key, contents, figure, engine)
+
+
+def read_export(location: str) -> dict:
+    """Reads an export file, columnar and sidecar exports are converted back to a dataframe and a figure dictionary.
+
+    The arrays of a sidecar export are memory-mapped, they are only read from disk when they are used.
+    Compressed exports are decompressed while they are read.
+    """
+
+    with open_export(location, "rb") as f:
+        content = f.read()
+
+    if resolve_engine("auto") == "orjson":
+        import orjson
+
+        try:
+            export = orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # The "json" engine writes missing values as NaN, which orjson does not read.
+            export = json.loads(content)
+    else:
+        export = json.loads(content)
+
+    key = next(key for key in export if key != "figureContents")
+
+    if export[key].get("dataFormat") == "columnar":
+        from dt_modules.columnar import from_columnar
+
+        export[key], export["figureContents"] = from_columnar(export[key], export["figureContents"])
+
+    if export[key].get("dataFormat") == "sidecar":
+        from dt_modules.sidecar import from_sidecar
+
+        export[key], export["figureContents"] = from_sidecar(export[key], export["figureContents"], location)
+
+    return export
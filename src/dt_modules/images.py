@@ -0,0 +1,94 @@
+from typing import Any, Iterable
+import os
+import time
+import traceback
+
+from dt_modules.batch import ExportResult, run_pool
+
+
+def _plotly_figure(figure):
+    """Returns the plotly figure of a dt_modules `figure` (building it), or a styled copy of a plotly figure."""
+
+    if hasattr(figure, "get_figure"):
+        return figure.get_figure()
+
+    import plotly.graph_objects as go
+    from dt_modules import apply_default_style
+
+    figure = go.Figure(figure)
+    apply_default_style(figure)
+
+    return figure
+
+
+def save_image(
+    figure,
+    location: str,
+    format: str | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    scale: float | None = None,
+) -> int:
+    """Renders `figure` to a static image (png, svg, pdf, ...) with Kaleido and returns the file size.
+
+    The format is taken from the extension of `location` when `format` is not given. Kaleido keeps its renderer
+    running between calls, so rendering many images in one process only starts it once.
+    """
+
+    import plotly.io as pio
+
+    pio.write_image(_plotly_figure(figure), location, format=format, width=width, height=height, scale=scale)
+    return os.path.getsize(location)
+
+
+def _start_renderer():
+    """Starts the Kaleido renderer of a worker process, so the first image does not pay for it."""
+
+    import plotly.graph_objects as go
+    import plotly.io as pio
+
+    pio.to_image(go.Figure(), format="png", width=10, height=10)
+
+
+def _render(figure, location: str, options: dict) -> ExportResult:
+    result = ExportResult(location)
+    start = time.perf_counter()
+
+    try:
+        figure = _plotly_figure(figure)
+        result.timings["build"] = time.perf_counter() - start
+
+        save_image(figure, location, **options)
+        result.timings["render"] = time.perf_counter() - start - result.timings["build"]
+    except Exception:
+        result.error = traceback.format_exc()
+
+    result.timings["total"] = time.perf_counter() - start
+    return result
+
+
+def export_images(
+    figures: dict[str, Any] | Iterable[tuple[str, Any]],
+    fmt: str | None = None,
+    workers: int | None = None,
+    width: int | None = None,
+    height: int | None = None,
+    scale: float | None = None,
+) -> list[ExportResult]:
+    """Renders many figures to static images on a pool of `workers` processes, each with a warm Kaleido renderer.
+
+    `figures` maps the output location to a chart (built in the worker) or a plotly figure. Every worker writes its
+    images to disk as soon as they are rendered. Returns an `ExportResult` per image, in order; a failing image does
+    not stop the others. With `workers=1` the images are rendered in this process.
+    """
+
+    items = list(figures.items() if isinstance(figures, dict) else figures)
+    options = {"format": fmt, "width": width, "height": height, "scale": scale}
+
+    return run_pool(
+        _render,
+        [(figure, location, options) for location, figure in items],
+        [location for location, _ in items],
+        workers,
+        initializer=_start_renderer,
+    )
@@ -0,0 +1,92 @@
+from typing import Any
+import json
+
+from dt_modules.columnar import decode_array
+from dt_modules.export import open_export, page_location, read_export
+
+
+def _dataframe(value: Any):
+    """Returns the dataframe of an export, dict exports (`DataFrame.to_dict()`) get their integer index back."""
+
+    import pandas as pd
+
+    if not isinstance(value, dict):
+        return value
+
+    data = pd.DataFrame(value)
+
+    try:
+        data.index = data.index.astype(int)
+    except (TypeError, ValueError):
+        pass
+
+    return data
+
+
+def _decode_typed_arrays(value: Any) -> Any:
+    """Replaces plotly's typed arrays (`{"dtype", "bdata"}`) in a figure dict with numpy arrays."""
+
+    if isinstance(value, dict):
+        if "bdata" in value and "dtype" in value:
+            return decode_array(value)
+
+        return {key: _decode_typed_arrays(item) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_decode_typed_arrays(item) for item in value]
+
+    return value
+
+
+def _page_cells(location: str, pagination: dict, columns: int) -> list[list]:
+    """Returns the cells of a paginated table, collected from the page files next to the export at `location`."""
+
+    cells = [[] for _ in range(columns)]
+
+    for page in range(pagination["pageCount"]):
+        with open_export(page_location(location, page)) as f:
+            values = json.load(f)["values"]
+
+        for column, page_values in zip(cells, values):
+            column.extend(page_values)
+
+    return cells
+
+
+def load_export(location: str, validate: bool = True):
+    """Loads an export file back into its chart (`BarChart`, `LineChart`, `Table`, ...) without running plotly express.
+
+    The chart class is looked up by the `chartType` in `dt_modules.chart_specs`, its settings are restored from the
+    parameters and the stored figure is used as its plotly figure, so it can be restyled and saved again. The file is
+    parsed with orjson when installed; compressed, columnar and sidecar exports are supported.
+    Without `validate` plotly does not check the figure, which is much faster for large figures, but the figure can
+    then only be saved again, not changed.
+    """
+
+    import plotly.graph_objects as go
+    from dt_modules.specs import chart_specs
+
+    export = read_export(location)
+    key = next(key for key in export if key != "figureContents")
+    parameters = dict(export[key])
+    chart_type = parameters.get("chartType")
+
+    if chart_type not in chart_specs:
+        raise ValueError(f"Can not load charts of type '{chart_type}', expected one of {list(chart_specs)}.")
+
+    import dt_modules
+
+    chart_class = getattr(dt_modules, chart_specs[chart_type].chart_class)
+    # As arrays, so the traces can be extended like the ones of a built figure (e.g. by `LineChart.append`).
+    figure = go.Figure(_decode_typed_arrays(export["figureContents"]), _validate=validate)
+
+    for name in ("dataframe", "outliers"):
+        if name in parameters:
+            parameters[name] = _dataframe(parameters[name])
+
+    chart = chart_class.from_export(parameters, figure)
+
+    if parameters.get("pagination") is not None:
+        chart.cells = _page_cells(location, parameters["pagination"], len(chart.headers))
+
+    return chart
@@ -0,0 +1,141 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, NamedTuple
+import os
+import time
+
+
+class PhaseTiming(NamedTuple):
+    """Duration of one phase of building or exporting a chart, `bytes` is the size of the file the phase wrote."""
+
+    chart: str | None
+    phase: str
+    seconds: float
+    bytes: int | None = None
+    parent: str | None = None
+
+
+# Functions called with every `PhaseTiming`, phases are only timed while there is at least one.
+_listeners: list[Callable[[PhaseTiming], None]] = []
+
+# The chart and phase being timed, so nested phases (e.g. the encoding inside `save_json`) know where they belong.
+_current: ContextVar[tuple[str | None, str] | None] = ContextVar("dt_modules_phase", default=None)
+
+
+def add_listener(listener: Callable[[PhaseTiming], None]):
+    """Calls `listener` with the timing of every phase from now on, e.g. to log slow exports."""
+
+    _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[PhaseTiming], None]):
+    _listeners.remove(listener)
+
+
+class Phase:
+    """Times the enclosed code as a `phase` of `chart` (or of the enclosing phase) when anyone is listening."""
+
+    __slots__ = ("name", "chart", "location", "start", "token")
+
+    def __init__(self, name: str, chart=None, location: str | None = None):
+        self.name = name
+        self.chart = chart
+        self.location = location
+        self.start = None
+
+    def __enter__(self):
+        if _listeners:
+            current = _current.get()
+            chart = type(self.chart).__name__ if self.chart is not None else current and current[0]
+            self.token = _current.set((chart, self.name))
+            self.start = time.perf_counter()
+
+        return self
+
+    def __exit__(self, error_type, error, error_traceback):
+        if self.start is None:
+            return
+
+        seconds = time.perf_counter() - self.start
+        chart, _ = _current.get()
+        _current.reset(self.token)
+        parent = _current.get()
+
+        size = None
+        if self.location is not None and error_type is None:
+            size = os.path.getsize(self.location)
+
+        timing = PhaseTiming(chart, self.name, seconds, size, parent and parent[1])
+
+        for listener in list(_listeners):
+            listener(timing)
+
+
+class Profile:
+    """The phase timings collected by `profile`, and the `cProfile` statistics when those were requested."""
+
+    def __init__(self):
+        self.timings: list[PhaseTiming] = []
+        self.stats = None
+
+    def __call__(self, timing: PhaseTiming):
+        self.timings.append(timing)
+
+    def totals(self) -> dict[tuple[str | None, str], float]:
+        """Returns the total duration of every chart class and phase."""
+
+        totals = {}
+        for timing in self.timings:
+            key = (timing.chart, timing.phase)
+            totals[key] = totals.get(key, 0.0) + timing.seconds
+
+        return totals
+
+    def report(self) -> str:
+        """Returns a table of the total duration of every chart class and phase, slowest first."""
+
+        totals = sorted(self.totals().items(), key=lambda item: item[1], reverse=True)
+        return "\n".join(f"{chart or '-':>12} {phase:<20} {seconds:9.4f}s" for (chart, phase), seconds in totals)
+
+
+@contextmanager
+def profile(
+    callback: Callable[[PhaseTiming], None] | None = None,
+    cprofile: bool = False,
+    dump: str | None = None,
+) -> Iterator[Profile]:
+    """Collects the duration (and output size) of every chart phase in the block, e.g. `with profile() as p:`.
+
+    The phases are `build_figure`, `apply_default_style`, `save_json` (with `to_columnar`, `write_sidecar`,
+    `encode_parameters`, `to_dict` and `encode_figure` inside it), `save_pages`, `save_excel`, `save_image` and
+    `save_parameters`; `callback` is also called with every timing. With `cprofile` the block runs under `cProfile`
+    and `Profile.stats` holds the statistics, `dump` also writes them to a file for `pstats` or snakeviz.
+    """
+
+    result = Profile()
+    listeners = [result] if callback is None else [result, callback]
+
+    for listener in listeners:
+        add_listener(listener)
+
+    profiler = None
+    if cprofile or dump is not None:
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+
+    try:
+        yield result
+    finally:
+        if profiler is not None:
+            import pstats
+
+            profiler.disable()
+            result.stats = pstats.Stats(profiler)
+
+            if dump is not None:
+                profiler.dump_stats(dump)
+
+        for listener in listeners:
+            remove_listener(listener)
@@ -0,0 +1,148 @@
+from pathlib import Path
+from typing import Any, BinaryIO
+import base64
+
+import numpy as np
+import pandas as pd
+
+from dt_modules.columnar import decode_dataframe, encode_dataframe, reference_columns, resolve_columns
+
+
+# Arrays start at a multiple of this many bytes, so memory-mapped arrays are aligned.
+SIDECAR_ALIGNMENT = 64
+
+# Array kinds stored in the sidecar: integers, unsigned integers, floats, booleans, dates and durations.
+_SIDECAR_KINDS = "iufbMm"
+
+
+def sidecar_location(location: str | Path) -> Path:
+    """Returns the sidecar file of the export at `location`, `chart.export.json` has `chart.export.bin`."""
+
+    return Path(location).with_suffix(".bin")
+
+
+class SidecarWriter:
+    """Appends raw little-endian arrays to a binary `file` and returns the descriptors referring to them."""
+
+    def __init__(self, file: BinaryIO):
+        self.file = file
+        self.offset = 0
+
+    def add(self, values: Any) -> dict | list:
+        """Writes the numeric array `values` (without copying it when it is contiguous and little-endian).
+
+        Returns a `{"$sidecar": {"dtype", "offset", "shape"}}` descriptor, other values are returned as a list.
+        """
+
+        values = np.asarray(values)
+
+        if values.dtype.kind not in _SIDECAR_KINDS:
+            return values.tolist()
+
+        values = np.ascontiguousarray(values, dtype=values.dtype.newbyteorder("<"))
+        padding = -self.offset % SIDECAR_ALIGNMENT
+
+        self.file.write(b"\0" * padding)
+        self.offset += padding
+
+        # A byte view of the array's own buffer, works for every dtype (memoryview refuses dates).
+        self.file.write(values.reshape(-1).view(np.uint8).data)
+
+        descriptor = {"dtype": values.dtype.str, "offset": self.offset, "shape": list(values.shape)}
+        self.offset += values.nbytes
+
+        return {"$sidecar": descriptor}
+
+
+def _plotly_array(value: dict) -> np.ndarray:
+    """Decodes a plotly typed array (`{"dtype", "bdata", "shape"}`) from `Figure.to_dict`."""
+
+    values = np.frombuffer(base64.b64decode(value["bdata"]), dtype=np.dtype(value["dtype"]).newbyteorder("<"))
+
+    if "shape" in value:
+        values = values.reshape([int(size) for size in str(value["shape"]).split(",")])
+
+    return values
+
+
+def _move_arrays(value: Any, writer: SidecarWriter) -> Any:
+    """Replaces the numeric arrays (and plotly typed arrays) in a figure dict with sidecar descriptors."""
+
+    if isinstance(value, dict):
+        if "bdata" in value and "dtype" in value:
+            return writer.add(_plotly_array(value))
+
+        return {key: _move_arrays(item, writer) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_move_arrays(item, writer) for item in value]
+
+    if isinstance(value, (np.ndarray, pd.Series, pd.Index)):
+        return writer.add(value)
+
+    return value
+
+
+def to_sidecar(contents: dict, figure: dict, file: BinaryIO, name: str) -> tuple[dict, dict]:
+    """Converts export `contents` and the `figure` dict to the sidecar data format, writing the arrays to `file`.
+
+    The dataframe is stored per column like the "columnar" format, `name` is the file name of the sidecar.
+    """
+
+    writer = SidecarWriter(file)
+    contents = dict(contents)
+    data = contents.get("dataframe")
+
+    if isinstance(data, pd.DataFrame):
+        contents["dataframe"] = encode_dataframe(data, encode=writer.add)
+        figure = reference_columns(figure, data, contents.get("columnToColor"))
+
+    contents["dataFormat"] = "sidecar"
+    contents["sidecar"] = name
+
+    return contents, _move_arrays(figure, writer)
+
+
+def load_sidecar(location: str | Path) -> np.memmap:
+    """Memory-maps a sidecar file, copy-on-write, so arrays read from it can be changed without changing the file."""
+
+    if Path(location).stat().st_size == 0:
+        # Nothing to map, the export has no numeric arrays.
+        return np.empty(0, dtype=np.uint8)
+
+    return np.memmap(location, dtype=np.uint8, mode="c")
+
+
+def _resolve_arrays(value: Any, buffer: np.ndarray) -> Any:
+    if isinstance(value, dict):
+        if "$sidecar" in value:
+            descriptor = value["$sidecar"]
+            dtype = np.dtype(descriptor["dtype"])
+            count = int(np.prod(descriptor["shape"], dtype=np.int64))
+
+            values = np.frombuffer(buffer, dtype=dtype, count=count, offset=descriptor["offset"])
+            return values.reshape(descriptor["shape"])
+
+        return {key: _resolve_arrays(item, buffer) for key, item in value.items()}
+
+    if isinstance(value, list):
+        return [_resolve_arrays(item, buffer) for item in value]
+
+    return value
+
+
+def from_sidecar(contents: dict, figure: dict, location: str | Path) -> tuple[dict, dict]:
+    """Converts an export written by `to_sidecar` back, with arrays which are views of the memory-mapped sidecar."""
+
+    buffer = load_sidecar(Path(location).with_name(contents["sidecar"]))
+    contents = dict(contents)
+
+    del contents["dataFormat"], contents["sidecar"]
+    figure = _resolve_arrays(figure, buffer)
+
+    if isinstance(contents.get("dataframe"), dict) and "columns" in contents["dataframe"]:
+        data = decode_dataframe(contents["dataframe"], lambda values: _resolve_arrays(values, buffer), copy=False)
+        contents["dataframe"] = data
+        figure = resolve_columns(figure, data)
+
+    return contents, figure
@@ -0,0 +1,188 @@
+from dataclasses import dataclass, field, fields
+from typing import Any, ClassVar
+
+from dt_modules import blue_colors
+from dt_modules.export import encode_value
+
+
+# The spec class of every `chartType`, filled by `register`.
+chart_specs: dict[str, type["ChartSpec"]] = {}
+
+
+def register(chart_type: str, chart_class: str):
+    """Registers a spec class for the `chartType` of the dt_modules `chart_class` it describes."""
+
+    def decorator(spec_class: type["ChartSpec"]) -> type["ChartSpec"]:
+        spec_class.chart_type = chart_type
+        spec_class.chart_class = chart_class
+        chart_specs[chart_type] = spec_class
+
+        return spec_class
+
+    return decorator
+
+
+def _argument_names(spec_class: type) -> list[str]:
+    """Returns the names of the chart arguments of a spec class, the data first."""
+
+    return [spec_field.name for spec_field in fields(spec_class) if spec_field.name != "kwargs"]
+
+
+@dataclass(slots=True, eq=False)
+class ChartSpec:
+    """Describes a chart by its arguments only, so it can be created, pickled and serialized without plotly.
+
+    Specs are small slotted objects, use them to describe many charts (e.g. for worker processes) and `build`
+    the chart only where it is exported. The `kwargs` are passed to the chart, like the chart's own `**kwargs`.
+    """
+
+    chart_type: ClassVar[str]
+    chart_class: ClassVar[str]
+
+    kwargs: dict = field(default_factory=dict, kw_only=True)
+
+    def arguments(self) -> dict:
+        """Returns the arguments of the chart class, the data first."""
+
+        arguments = {name: getattr(self, name) for name in _argument_names(type(self))}
+        arguments.update(self.kwargs)
+
+        return arguments
+
+    def build(self):
+        """Creates the chart described by the spec."""
+
+        import dt_modules
+
+        return getattr(dt_modules, self.chart_class)(**self.arguments())
+
+    def to_dict(self) -> dict:
+        """Returns the spec as plain values, with the `chartType` and dataframes as lists per column."""
+
+        values = {"chartType": self.chart_type}
+
+        for name, value in self.arguments().items():
+            values[name] = value.to_dict(orient="list") if hasattr(value, "columns") else value
+
+        return values
+
+    def to_json(self, engine: str | None = None) -> bytes:
+        return encode_value(self.to_dict(), engine)
+
+    @staticmethod
+    def from_dict(values: dict) -> "ChartSpec":
+        """Returns the spec of the `chartType` in `values`, like they are written by `to_dict`."""
+
+        values = dict(values)
+        chart_type = values.pop("chartType")
+
+        if chart_type not in chart_specs:
+            raise ValueError(f"Unknown chart type '{chart_type}', expected one of {list(chart_specs)}.")
+
+        spec_class = chart_specs[chart_type]
+        names = _argument_names(spec_class)
+
+        if isinstance(values.get(names[0]), dict):
+            import pandas as pd
+
+            values[names[0]] = pd.DataFrame(values[names[0]])
+
+        kwargs = {name: values.pop(name) for name in list(values) if name not in names}
+        return spec_class(**values, kwargs=kwargs)
+
+
+@register("bar", "BarChart")
+@dataclass(slots=True, eq=False)
+class BarChartSpec(ChartSpec):
+    data: Any
+    x: str
+    y: str
+    column_to_color: str
+    colors: list[str] | None = None
+
+
+@register("pie", "PieChart")
+@dataclass(slots=True, eq=False)
+class PieChartSpec(ChartSpec):
+    data: Any
+    values: str
+    names: str
+    colors: list[str] | None = None
+
+
+@register("table", "Table")
+@dataclass(slots=True, eq=False)
+class TableSpec(ChartSpec):
+    headers: Any = None
+    cells: list | None = None
+    header_color: str = blue_colors[0]
+    cells_color: str = blue_colors[4]
+    line_color: str = "darkslategray"
+    alternate_row: bool = False
+    background_color: str = "white"
+    page_size: int | None = None
+
+
+@register("scatter", "ScatterPlot")
+@dataclass(slots=True, eq=False)
+class ScatterPlotSpec(ChartSpec):
+    data: Any
+    x: str
+    y: str
+    colors: list[str] | None = None
+    max_points: int | None = None
+    downsample: str = "lttb"
+    render_mode: str = "auto"
+    webgl_threshold: int = 1000
+
+
+@register("histogram", "Histogram")
+@dataclass(slots=True, eq=False)
+class HistogramSpec(ChartSpec):
+    data: Any
+    x: str
+    nbins: int = 10
+    colors: list[str] | None = None
+    x_label: str | None = None
+    y_label: str | None = None
+    prebin: bool = False
+    bin_range: tuple[float, float] | None = None
+
+
+@register("line", "LineChart")
+@dataclass(slots=True, eq=False)
+class LineChartSpec(ChartSpec):
+    data: Any
+    x: str
+    y: str
+    column_to_color: str
+    colors: list[str] | None = None
+    max_points: int | None = None
+    downsample: str = "lttb"
+    render_mode: str = "auto"
+    webgl_threshold: int = 1000
+
+
+@register("box", "BoxPlot")
+@dataclass(slots=True, eq=False)
+class BoxPlotSpec(ChartSpec):
+    data: Any
+    x: str
+    y: str
+    column_to_color: str
+    colors: list[str] | None = None
+    aggregate: bool = False
+    sample_size: int = 10_000
+
+
+@register("heatmap", "HeatMap")
+@dataclass(slots=True, eq=False)
+class HeatMapSpec(ChartSpec):
+    data: Any
+    x: str
+    y: str
+    value_column: str
+    color_continuous_scale: str | list | None = None
+    aggfunc: str | None = None
+    dtype: str = "float64"
+    max_resolution: tuple[int, int] | None = None
@@ -0,0 +1,172 @@
+from pathlib import Path
+from typing import Any, Iterable, Iterator
+import importlib.util
+import os
+
+import numpy as np
+import pandas as pd
+
+from dt_modules.aggregation import box_statistics
+
+
+# Rows read per chunk from csv and parquet files.
+default_chunksize = 1_000_000
+
+# Aggregation functions `pivot_cells` can compute from partial results.
+STREAMING_AGGFUNCS = ("mean", "sum", "count", "min", "max")
+
+
+def iter_chunks(source: Any, columns: list[str], chunksize: int | None = None) -> Iterator[pd.DataFrame]:
+    """Yields the `columns` of a csv or parquet file, or of an iterator of dataframes, in chunks of rows."""
+
+    chunksize = chunksize or default_chunksize
+    columns = list(dict.fromkeys(columns))
+
+    if not isinstance(source, (str, os.PathLike)):
+        for chunk in source:
+            yield chunk[columns]
+        return
+
+    suffix = Path(source).suffix.lower()
+
+    if suffix == ".csv":
+        yield from pd.read_csv(source, usecols=columns, chunksize=chunksize)
+    elif suffix == ".parquet":
+        if importlib.util.find_spec("pyarrow") is None:
+            raise ImportError("Streaming parquet files requires the pyarrow package, install `dt-modules[parquet]`.")
+
+        import pyarrow.parquet as pq
+
+        for batch in pq.ParquetFile(source).iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    else:
+        raise ValueError(f"Unsupported chunked data source '{source}', expected a .csv or .parquet file.")
+
+
+def _combine(total: pd.DataFrame | None, partial: pd.DataFrame, keys: list[str], how: dict[str, str]) -> pd.DataFrame:
+    """Merges the `partial` aggregates of a chunk into the `total`, keeping the groups in order of appearance."""
+
+    if total is not None:
+        partial = pd.concat([total, partial], ignore_index=True)
+
+    return partial.groupby(keys, sort=False, observed=True, dropna=False).agg(how).reset_index()
+
+
+def group_sums(chunks: Iterable[pd.DataFrame], keys: list[str], value: str) -> pd.DataFrame:
+    """Sums `value` per combination of `keys` over all chunks, groups are kept in order of appearance."""
+
+    keys = list(dict.fromkeys(keys))
+    total = None
+
+    for chunk in chunks:
+        partial = chunk.groupby(keys, sort=False, observed=True, dropna=False)[value].sum().reset_index()
+        total = _combine(total, partial, keys, {value: "sum"})
+
+    return total if total is not None else pd.DataFrame(columns=keys + [value])
+
+
+def value_range(chunks: Iterable[pd.DataFrame], column: str) -> tuple[float, float]:
+    """Returns the minimum and maximum of `column` over all chunks."""
+
+    low, high = np.inf, -np.inf
+
+    for chunk in chunks:
+        values = chunk[column].to_numpy(dtype=float)
+        low, high = min(low, np.nanmin(values, initial=np.inf)), max(high, np.nanmax(values, initial=-np.inf))
+
+    return low, high
+
+
+def bin_counts(chunks: Iterable[pd.DataFrame], column: str, nbins: int, bin_range: tuple[float, float]) -> pd.DataFrame:
+    """Counts `column` in `nbins` equal width bins over `bin_range`, like `aggregation.histogram_bins`."""
+
+    counts = np.zeros(nbins, dtype=np.int64)
+    edges = None
+
+    for chunk in chunks:
+        values = chunk[column].to_numpy(dtype=float)
+        chunk_counts, edges = np.histogram(values[~np.isnan(values)], bins=nbins, range=bin_range)
+        counts += chunk_counts
+
+    if edges is None:
+        edges = np.histogram_bin_edges([], bins=nbins, range=bin_range)
+
+    return pd.DataFrame({"start": edges[:-1], "end": edges[1:], "count": counts})
+
+
+def pivot_cells(chunks: Iterable[pd.DataFrame], index: str, columns: str, values: str, aggfunc: str | None = None) -> pd.DataFrame:
+    """Aggregates `values` per `index`/`columns` cell over all chunks, returns one row per cell.
+
+    Without `aggfunc` every cell must have at most one value, like `aggregation.pivot_grid`.
+    """
+
+    if aggfunc is not None and aggfunc not in STREAMING_AGGFUNCS:
+        raise ValueError(f"Aggregation '{aggfunc}' can not be streamed, expected one of {STREAMING_AGGFUNCS}.")
+
+    keys = [index, columns]
+    how = {"sum": "sum", "count": "sum", "min": "min", "max": "max"}
+    total = None
+
+    for chunk in chunks:
+        partial = chunk.groupby(keys, sort=False, observed=True)[values].agg(["sum", "count", "min", "max"]).reset_index()
+        total = _combine(total, partial, keys, how)
+
+    if total is None:
+        return pd.DataFrame(columns=keys + [values])
+
+    if aggfunc is None:
+        if (total["count"] > 1).any():
+            raise ValueError(f"'{index}' and '{columns}' contain duplicate entries, pass an `aggfunc` to combine them.")
+
+        # The value of every cell, a missing value sums to 0 so keep it missing like `aggregation.pivot_grid`.
+        cells = total["sum"].where(total["count"] > 0)
+    elif aggfunc == "mean":
+        cells = total["sum"] / total["count"]
+    else:
+        cells = total[aggfunc]
+
+    return total[keys].assign(**{values: cells})
+
+
+def box_sketch(
+    chunks: Iterable[pd.DataFrame],
+    x: str,
+    y: str,
+    group: str,
+    sample_size: int = 10_000,
+    seed: int = 0,
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Computes `aggregation.box_statistics` from a bounded, uniform sample of every box.
+
+    Every box keeps the `sample_size` values with the lowest random priority (a bottom-k sketch, which merges across
+    chunks), so the quartiles and outliers are estimates once a box has more values. The counts are exact, and so
+    are the fences when the box has no values beyond 1.5 IQR.
+    """
+
+    keys = list(dict.fromkeys([group, x]))
+    rng = np.random.default_rng(seed)
+    sample = None
+    totals = None
+
+    for chunk in chunks:
+        chunk = chunk.dropna(subset=[y])
+        partial = chunk.groupby(keys, sort=False, observed=True)[y].agg(["count", "min", "max"]).reset_index()
+        totals = _combine(totals, partial, keys, {"count": "sum", "min": "min", "max": "max"})
+
+        chunk = chunk.assign(_priority=rng.random(len(chunk)))
+        sample = chunk if sample is None else pd.concat([sample, chunk], ignore_index=True)
+        sample = sample.sort_values("_priority").groupby(keys, sort=False, observed=True).head(sample_size)
+
+    if sample is None:
+        return box_statistics(pd.DataFrame(columns=keys + [y]), x, y, group)
+
+    statistics, outliers = box_statistics(sample.drop(columns="_priority"), x, y, group)
+
+    # Order the boxes like the groups appeared in the data, with the exact counts and extremes.
+    statistics = totals.merge(statistics.drop(columns="count"), on=keys, how="left")
+    bound = 1.5 * (statistics["q3"] - statistics["q1"])
+    statistics["lowerfence"] = statistics["lowerfence"].where(statistics["min"] < statistics["q1"] - bound, statistics["min"])
+    statistics["upperfence"] = statistics["upperfence"].where(statistics["max"] > statistics["q3"] + bound, statistics["max"])
+
+    columns = keys + ["q1", "median", "q3", "lowerfence", "upperfence", "count"]
+    return statistics[columns], outliers
@@ -1,6 +1,5 @@
 import pandas as pd
 import plotly.express as px
-import json
 
 
 from dt_modules import BarChart, LineChart, PieChart, ScatterPlot, Histogram, BoxPlot, HeatMap, Figure, fill, fill_default_colors, government_theme, quantitative_colors
@@ -79,27 +78,31 @@ class CustomChart(Figure):
         else:
             colors = fill(len(data[x]), colors)
 
-        figure = px.sunburst(
-            data,
-            names=x,
-            parents=y,
-            values=values,
-            color=column_to_color,
-            color_discrete_sequence=colors,
-            **kwargs,
-        )
-
         self.data = data
         self.colors = colors
         self.column_to_color = column_to_color
         self.x = x
         self.y = y
-        super().__init__(figure)
+        self.values = values
+        self.kwargs = kwargs
+        super().__init__()
+
+    def build_figure(self):
+        # Only called when the figure is needed, e.g. by `get_figure` or `save_json`.
+        return px.sunburst(
+            self.data,
+            names=self.x,
+            parents=self.y,
+            values=self.values,
+            color=self.column_to_color,
+            color_discrete_sequence=self.colors,
+            **self.kwargs,
+        )
 
-    def save_json(self, location: str):
+    def get_parameters(self) -> dict:
         parameters = {
             "chartType": "custom",
-            "dataframe": self.data.to_dict(),
+            "dataframe": self.data,
             "length": self.data.shape[0],
             "columns": list(self.data.columns),
             "colors": self.colors,
@@ -108,11 +111,7 @@ class CustomChart(Figure):
             "y": self.y,
         }
 
-        figure_contents = json.loads(self.get_figure().to_json())
-        export_contents = { "parameters": parameters, "figureContents": figure_contents }
-
-        with open(location, "w") as f:
-            json.dump(export_contents, f)
+        return parameters
 
 def main():
     data = {
@@ -136,33 +135,33 @@ def main():
     df = px.data.gapminder().query("continent == 'Oceania'")
     line_chart = LineChart(df, x="year", y="lifeExp", column_to_color="country")
     line_chart.save_json("./exports/line_chart.export.json")
-    line_chart.data.to_excel("exports/line_chart.export.xlsx")
+    line_chart.save_excel("exports/line_chart.export.xlsx")
 
     # Scatter
     scatter_df = pd.DataFrame(data={"x": [0, 1, 2, 3, 4], "y": [0, 1, 4, 9, 16]})
     scatter = ScatterPlot(scatter_df, x="x", y="y")
     # scatter.get_figure().show()
     scatter.save_json("./exports/scatter.export.json")
-    scatter.data.to_excel("exports/scatter.export.xlsx")
+    scatter.save_excel("exports/scatter.export.xlsx")
 
     # Histogram
     df = px.data.tips()
     histogram = Histogram(df, x="total_bill", nbins=10, title="test title", y_label="cost", colors=["#CA005D"])
     histogram.save_json("./exports/histogram.export.json")
-    histogram.data.to_excel("exports/histogram.export.xlsx")
+    histogram.save_excel("exports/histogram.export.xlsx")
 
     # Boxplot
     box_plot = BoxPlot(df, x="time", column_to_color="time", y="total_bill")
     # box_plot.get_figure().show()
     box_plot.save_json("./exports/box_plot.export.json")
-    box_plot.data.to_excel("exports/box_plot.export.xlsx")
+    box_plot.save_excel("exports/box_plot.export.xlsx")
 
     # Heatmap
     heatmap_data = get_heatmap_data()
     df = pd.DataFrame(heatmap_data)
     heatmap = HeatMap(df, x="provincie", y="sector", value_column="werkloosheid")
     heatmap.save_json("exports/heatmap.export.json")
-    heatmap.data.to_excel("exports/heatmap.export.xlsx")
+    heatmap.save_excel("exports/heatmap.export.xlsx")
 
     # Custom chart
     data = dict(